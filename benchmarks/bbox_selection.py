@@ -0,0 +1,130 @@
+"""
+Benchmark bounding box selection latency on synthetic Boston 311 data.
+
+Compares the original per-row ``ST_X``/``ST_Y`` predicate, the precomputed
+``lon``/``lat`` range filter and ``ST_Intersects`` served by an R-tree index.
+
+Usage:
+    uv run python benchmarks/bbox_selection.py --rows 1000000 10000000 30000000
+"""
+
+import argparse
+import logging
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import duckdb
+
+log = logging.getLogger(__name__)
+
+# Approximate extent of the City of Boston
+BOSTON_BOUNDS = (-71.19, 42.23, -70.99, 42.40)
+
+PREDICATES = {
+    "st_x_st_y": (
+        "ST_X(geometry) BETWEEN {minx} AND {maxx} "
+        "AND ST_Y(geometry) BETWEEN {miny} AND {maxy}"
+    ),
+    "lon_lat": "lon BETWEEN {minx} AND {maxx} AND lat BETWEEN {miny} AND {maxy}",
+    "rtree": "ST_Intersects(geometry, ST_MakeEnvelope({minx}, {miny}, {maxx}, {maxy}))",
+}
+
+
+def build_table(con: duckdb.DuckDBPyConnection, rows: int) -> None:
+    """Create a synthetic requests table with lon/lat columns and an R-tree index."""
+    minx, miny, maxx, maxy = BOSTON_BOUNDS
+    con.sql("DROP TABLE IF EXISTS requests")
+    con.sql(f"""
+        CREATE TABLE requests AS
+        SELECT open_dt, lon, lat, ST_Point(lon, lat) AS geometry
+        FROM (
+            SELECT
+                TIMESTAMP '2011-01-01' + to_seconds(random() * 4.5e8) AS open_dt,
+                {minx} + random() * {maxx - minx} AS lon,
+                {miny} + random() * {maxy - miny} AS lat
+            FROM range({rows})
+        )
+        ORDER BY open_dt
+    """)
+    con.sql("CREATE INDEX requests_geometry_idx ON requests USING RTREE (geometry)")
+    con.sql("CHECKPOINT")
+
+
+def random_box(rng: random.Random, size: float) -> dict[str, float]:
+    """Pick a square box of ``size`` degrees inside the Boston extent."""
+    minx, miny, maxx, maxy = BOSTON_BOUNDS
+    x = rng.uniform(minx, maxx - size)
+    y = rng.uniform(miny, maxy - size)
+    return {"minx": x, "miny": y, "maxx": x + size, "maxy": y + size}
+
+
+def time_predicate(
+    con: duckdb.DuckDBPyConnection,
+    predicate: str,
+    boxes: list[dict[str, float]],
+    limit: int,
+) -> float:
+    """Return the median latency in milliseconds of a selection query."""
+    timings = []
+    for box in boxes:
+        query = f"""
+            SELECT open_dt, geometry FROM requests
+            WHERE {predicate.format(**box)}
+            ORDER BY open_dt DESC
+            LIMIT {limit}
+        """
+        start = time.perf_counter()
+        con.sql(query).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[1_000_000, 10_000_000, 30_000_000]
+    )
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--box-size", type=float, default=0.01)
+    parser.add_argument("--limit", type=int, default=1000)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+
+    rng = random.Random(311)
+    boxes = [random_box(rng, args.box_size) for _ in range(args.repeats)]
+    results: list[tuple[int, dict[str, float]]] = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        con = duckdb.connect(str(Path(tmp) / "bench.duckdb"))
+        con.install_extension("spatial")
+        con.load_extension("spatial")
+
+        for rows in args.rows:
+            log.info(f"Building synthetic table with {rows:,} rows...")
+            build_table(con, rows)
+            timings = {
+                name: time_predicate(con, predicate, boxes, args.limit)
+                for name, predicate in PREDICATES.items()
+            }
+            log.info(f"{rows:,} rows: {timings}")
+            results.append((rows, timings))
+
+        con.close()
+
+    header = f"{'rows':>12} | " + " | ".join(f"{name:>12}" for name in PREDICATES)
+    print(header)
+    print("-" * len(header))
+    for rows, timings in results:
+        cells = " | ".join(f"{timings[name]:>9.1f} ms" for name in PREDICATES)
+        print(f"{rows:>12,} | {cells}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark building a lonboard layer from WKB versus GeoArrow point geometry.
+
+The WKB variant mirrors the previous map path (``ST_AsWKB`` blobs parsed by
+lonboard); the point variant interleaves the precomputed ``lon``/``lat``
+columns with ``lonlat_to_points``, and the quantized variant also snaps them
+to a ``--precision`` meter grid. Each variant runs in a fresh process and
+reports the time to build the layer and serialize its first payload, the
+payload size, and the process memory above the synthetic input.
+
+Usage:
+    uv run python benchmarks/geoarrow_layer.py --rows 5000000 --precision 2
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import resource
+import time
+
+import numpy as np
+import pyarrow as pa
+import shapely
+from lonboard._layer import ScatterplotLayer
+from lonboard._serialization import serialize_table
+
+from boston311.config import config
+from boston311.geoarrow import lonlat_to_points, point_field_metadata
+
+log = logging.getLogger(__name__)
+
+# Approximate extent of the City of Boston
+BOSTON_BOUNDS = (-71.19, 42.23, -70.99, 42.40)
+
+VARIANTS = ("wkb", "point", "quantized")
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB."""
+    with open("/proc/self/statm") as statm:
+        pages = int(statm.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+def synthetic_table(rows: int, variant: str) -> pa.Table:
+    """Random points in Boston with the columns each map path starts from."""
+    rng = np.random.default_rng(311)
+    minx, miny, maxx, maxy = BOSTON_BOUNDS
+    lon = rng.uniform(minx, maxx, rows)
+    lat = rng.uniform(miny, maxy, rows)
+    row_id = pa.array(np.arange(rows, dtype=np.int64))
+
+    if variant != "wkb":
+        return pa.table({"row_id": row_id, "lon": lon, "lat": lat})
+
+    wkb = pa.array(shapely.to_wkb(shapely.points(lon, lat)), type=pa.binary())
+    # The metadata only differs from the point column in the extension name
+    metadata = {**point_field_metadata(), b"ARROW:extension:name": b"geoarrow.wkb"}
+    schema = pa.schema(
+        [
+            pa.field("row_id", pa.int64()),
+            pa.field("geometry", pa.binary(), metadata=metadata),
+        ]
+    )
+    return pa.Table.from_arrays([row_id, wkb], schema=schema)
+
+
+def run_variant(
+    rows: int, variant: str, precision: float, results: multiprocessing.Queue
+) -> None:
+    """Build and serialize a layer, reporting timings and memory."""
+    table = synthetic_table(rows, variant)
+    baseline = current_rss_mb()
+
+    start = time.perf_counter()
+    if variant == "point":
+        table = lonlat_to_points(table)
+    elif variant == "quantized":
+        table = lonlat_to_points(table, precision, config.REFERENCE_LATITUDE)
+    layer = ScatterplotLayer(table=table.drop_columns(["row_id"]))
+    built = time.perf_counter()
+    payload = serialize_table(layer.table, layer)
+    serialized = time.perf_counter()
+
+    results.put(
+        {
+            "variant": variant,
+            "build_s": built - start,
+            "first_render_s": serialized - start,
+            "payload_mb": sum(len(buffer) for buffer in payload) / 2**20,
+            "peak_mb": peak_rss_mb() - baseline,
+        }
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--precision", type=float, default=2.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    rows = []
+    for variant in VARIANTS:
+        log.info(f"Running {variant} variant with {args.rows:,} rows...")
+        process = context.Process(
+            target=run_variant, args=(args.rows, variant, args.precision, results)
+        )
+        process.start()
+        rows.append(results.get())
+        process.join()
+
+    header = (
+        f"{'variant':>9} | {'build':>9} | {'first render':>12} | "
+        f"{'payload':>10} | {'peak memory':>11}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['variant']:>9} | {row['build_s']:>7.2f} s | "
+            f"{row['first_render_s']:>10.2f} s | {row['payload_mb']:>7.1f} MB | "
+            f"{row['peak_mb']:>8.0f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
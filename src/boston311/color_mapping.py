@@ -1,14 +1,21 @@
 """Color mapping utilities for the Boston 311 dashboard."""
 
-from typing import Any, Literal
+from typing import Any, Literal, cast
 
 import colorcet as cc
 import duckdb
-import panel as pn
-from lonboard.colormap import apply_categorical_cmap
+import numpy as np
+import pyarrow as pa
 
 from boston311.config import config
-from boston311.database import con
+from boston311.database import (
+    get_connection,
+    get_dimension_options,
+    on_reload,
+    open_cursor,
+)
+from boston311.lazy import lazy
+from boston311.result_cache import result_cache
 from boston311.sql_utils import SQLUtils
 
 
@@ -18,7 +25,6 @@ def to_rgb(hex: str) -> list[int]:
     return list(int(h[i : i + 2], 16) for i in (0, 2, 4))
 
 
-@pn.cache
 def get_global_color_mappings(
     con: duckdb.DuckDBPyConnection,
 ) -> dict[str, dict[str, list[int]]]:
@@ -33,10 +39,11 @@ def get_global_color_mappings(
     color_mappings: dict[str, dict[str, list[int]]] = {}
     colors = [to_rgb(hex_color) for hex_color in cc.palette["glasbey_category10"]]
 
+    # Get all unique values from the full dataset in a single scan
+    options = get_dimension_options(con)
+
     for column in config.COLOR_COLUMNS:
-        # Get all unique values from the full dataset using safe query building
-        query = SQLUtils.build_distinct_column_query(column)
-        unique_values = [row[0] for row in con.sql(query).fetchall()]
+        unique_values = list(options[column])
 
         # Create stable color mapping - store RGB directly
         color_mappings[column] = {
@@ -48,60 +55,164 @@ def get_global_color_mappings(
     return color_mappings
 
 
+def build_color_lookup_table(
+    rgb_color_map: dict[str, list[int]],
+) -> tuple[dict[str, int], np.ndarray]:
+    """Build a lookup table indexed by color mapping position.
+
+    Args:
+        rgb_color_map: Mapping of values to RGB colors, including "None"
+
+    Returns:
+        Tuple of (value to row index, ``uint8`` RGB array of shape (n, 3))
+    """
+    index = {value: i for i, value in enumerate(rgb_color_map)}
+    lut = np.array(list(rgb_color_map.values()), dtype=np.uint8).reshape(-1, 3)
+    return index, lut
+
+
 def map_column_to_color(
-    duckframe: duckdb.DuckDBPyRelation,
+    table: pa.Table,
     column: Literal["source", "subject", "neighborhood"],
     alpha: float = 1.0,
     return_legend: bool = False,
 ) -> tuple[Any, dict[str, str]] | Any:
     """Map column values to colors using stable global color mappings.
 
+    Colors are assigned from the column's dictionary codes: each chunk's small
+    dictionary is remapped onto a precomputed RGBA lookup table, which is then
+    indexed directly with the codes, so no per-row strings are materialized.
+
     Args:
-        duckframe: DuckDB relation containing the data
+        table: Arrow table containing the data
         column: Column name to map colors for (must be a supported column)
         alpha: Alpha transparency value (0.0-1.0)
         return_legend: Whether to return legend data along with colors
 
     Returns:
-        Color array, or tuple of (color_array, legend_data) if return_legend=True
+        ``uint8`` RGBA array, or tuple of (color_array, legend_data) if
+        return_legend=True
 
     """
     # Validate column name
     validated_column = SQLUtils.validate_column_name(column)
 
     # Use the global color mapping for this column (already in RGB format)
-    rgb_color_map = GLOBAL_COLOR_MAPPINGS.get(validated_column, {})
+    rgb_color_map = global_color_mappings().get(validated_column, {})
 
     # Early returns for edge cases
-    if not rgb_color_map:
+    if not rgb_color_map or table.num_rows == 0:
         return ([], {}) if return_legend else []
 
-    values_df = con.sql(
-        f"SELECT {validated_column}::VARCHAR as value FROM duckframe"
-    ).fetchdf()
-    if values_df.empty:
-        return ([], {}) if return_legend else []
-
-    # Apply the categorical colormap using stable mappings
-    color_array = apply_categorical_cmap(
-        values_df["value"].astype(str),
-        rgb_color_map,
-        alpha=int(alpha * 255),
-    )
+    index, rgb_lut = color_lookup_tables()[validated_column]
+    null_index = index["None"]
+    rgba_lut = np.empty((len(rgb_lut), 4), dtype=np.uint8)
+    rgba_lut[:, :3] = rgb_lut
+    rgba_lut[:, 3] = int(alpha * 255)
+
+    # Each RGBA row is gathered as a single 32-bit word
+    rgba_words = rgba_lut.view(np.uint32).ravel()
+    color_array = np.empty((table.num_rows, 4), dtype=np.uint8)
+    color_words = color_array.view(np.uint32).ravel()
+    used = np.zeros(len(rgb_lut), dtype=bool)
+    offset = 0
+    for chunk in table.column(validated_column).chunks:
+        if not pa.types.is_dictionary(chunk.type):
+            chunk = chunk.dictionary_encode()
+
+        # Remap the chunk's dictionary onto lookup table rows; nulls use the
+        # extra trailing code
+        dictionary = chunk.dictionary.cast(pa.string()).to_pylist()
+        remap = np.array(
+            [index.get(value, null_index) for value in dictionary] + [null_index],
+            dtype=np.intp,
+        )
+        codes = chunk.indices.fill_null(len(dictionary)).to_numpy()
+
+        color_words[offset : offset + len(chunk)] = rgba_words[remap][codes]
+        used[remap[np.bincount(codes, minlength=len(remap)) > 0]] = True
+        offset += len(chunk)
 
     # Return with legend if requested
     if not return_legend:
         return color_array
 
     # Generate legend data
-    unique_values_in_data = values_df["value"].unique().tolist()
+    values = list(rgb_color_map)
     legend_data = {
-        value: f"#{rgb_color_map[value][0]:02x}{rgb_color_map[value][1]:02x}{rgb_color_map[value][2]:02x}"
-        for value in unique_values_in_data
-        if value in rgb_color_map
+        values[i]: "#{:02x}{:02x}{:02x}".format(*rgb_lut[i])
+        for i in np.flatnonzero(used)
     }
     return color_array, legend_data
 
 
-# Cache the global color mappings
-GLOBAL_COLOR_MAPPINGS = get_global_color_mappings(con)
+def map_counts_to_color(counts: pa.ChunkedArray | pa.Array) -> np.ndarray:
+    """Map bin counts to a sequential palette on a logarithmic scale.
+
+    Args:
+        counts: Non-negative counts, one per bin
+
+    Returns:
+        ``uint8`` RGBA array of shape (n, 4), fully opaque
+    """
+    palette = np.array(
+        [to_rgb(hex_color) for hex_color in cc.palette[config.BIN_COLOR_PALETTE]],
+        dtype=np.uint8,
+    )
+    values = np.log1p(np.asarray(counts, dtype=np.float64))
+    color_array = np.full((len(values), 4), 255, dtype=np.uint8)
+    if len(values) == 0:
+        return color_array
+
+    # Scale into palette positions; an all-equal input maps to the first color
+    top = values.max()
+    scale = (len(palette) - 1) / top if top > 0 else 0.0
+    color_array[:, :3] = palette[(values * scale).astype(np.intp)]
+    return color_array
+
+
+def dataset_colors(
+    key: tuple, table: pa.Table, column: str
+) -> tuple[np.ndarray, dict[str, str]]:
+    """Fill colors and legend of a loaded map dataset, shared through the result cache.
+
+    Args:
+        key: Level of detail key identifying the dataset
+        table: The dataset's Arrow table
+        column: "count" for bins, else the column points are colored by
+
+    Returns:
+        Tuple of (``uint8`` RGBA array, legend data); bins have no legend
+    """
+
+    def compute() -> tuple[np.ndarray, dict[str, str]]:
+        if column == "count":
+            return map_counts_to_color(table.column("count")), {}
+        return map_column_to_color(
+            table,
+            cast(Literal["source", "subject", "neighborhood"], column),
+            return_legend=True,
+        )
+
+    return result_cache.get_or_compute(("colors", key, column), compute)
+
+
+@lazy
+def global_color_mappings() -> dict[str, dict[str, list[int]]]:
+    """Color mappings of the full dataset, computed on first use."""
+    with open_cursor(get_connection()) as cursor:
+        return get_global_color_mappings(cursor)
+
+
+@lazy
+def color_lookup_tables() -> dict[str, tuple[dict[str, int], np.ndarray]]:
+    """Lookup tables of the global color mappings, built on first use."""
+    return {
+        column: build_color_lookup_table(rgb_color_map)
+        for column, rgb_color_map in global_color_mappings().items()
+    }
+
+
+# New data can bring new values; rebuild the mappings on next use
+on_reload(global_color_mappings.reset)
+on_reload(color_lookup_tables.reset)
@@ -11,16 +11,105 @@ class AppConfig:
     # Data configuration
     DATA_PATH: Path = Path("data/raw/*.parquet")
 
+    # Persistent database configuration
+    DATABASE_PATH: Path = Path("data/boston311.duckdb")
+    SCHEMA_VERSION: int = 7
+
+    # Ingest schema: columns loaded into the requests table
+    INGEST_COLUMNS: tuple[str, ...] = (
+        "open_dt",
+        "source",
+        "subject",
+        "neighborhood",
+        "geometry",
+    )
+    # Low-cardinality columns stored as DuckDB ENUMs
+    ENUM_COLUMNS: tuple[str, ...] = ("source", "subject", "neighborhood")
+    # Opt-in wide mode: load every column except the excluded ones
+    INGEST_WIDE: bool = False
+    INGEST_EXCLUDE_COLUMNS: tuple[str, ...] = ("geom_4326",)
+
+    # Physical layout: rows are clustered by these columns so min/max zone maps
+    # can skip row groups outside the filtered time range
+    SORT_COLUMNS: tuple[str, ...] = ("open_dt", "neighborhood")
+    # Rows per row group in the database and parquet files (multiple of 2048)
+    ROW_GROUP_SIZE: int = 61440
+    # Build an R-tree index on the geometry column and use it for box queries
+    SPATIAL_INDEX: bool = True
+
     # UI configuration
     TABLE_PAGE_SIZE: int = 25
     TABLE_HEIGHT: int = 400
     MAP_HEIGHT: int = 600
     SIDEBAR_WIDTH: int = 350
+    SHOW_OPTION_COUNTS: bool = True
+
+    # Latitude at which ground distances are converted to degrees of longitude
+    REFERENCE_LATITUDE: float = 42.3601
+    # Opt-in coordinate quantization for the map: snap points to a grid of
+    # this many meters and send float32 when its rounding error fits too
+    COORDINATE_PRECISION_METERS: float | None = None
+
+    # Worker threads running dashboard queries off the server's event loop
+    QUERY_THREADS: int = 4
+    # DuckDB worker threads shared by all cursors (DuckDB sets this per
+    # database, not per connection); None uses one per core. start.py splits
+    # them between its worker processes
+    DUCKDB_THREADS: int | None = None
+    # DuckDB buffer pool size of each worker process, e.g. "2GB"; None leaves
+    # DuckDB's default of 80% of RAM with one worker, and splits it between
+    # the workers started by start.py with several
+    DUCKDB_MEMORY_LIMIT: str | None = None
+
+    # Server worker processes started by start.py (0 resolves to the number of
+    # cores); each attaches the same prebuilt database read-only
+    NUM_PROCS: int = 1
+
+    # Startup warmup: option lists, "All" filter bins at these zoom levels
+    # (below LOD_POINT_ZOOM) and their colors for every time period go into the
+    # result cache, before serving or in a background thread
+    WARMUP_PERIODS: bool = True
+    WARMUP_ZOOMS: tuple[int, ...] = (10, 11)
+    WARMUP_BACKGROUND: bool = False
+
+    # Hot reload: workers poll the DATA_PATH fingerprint this often and swap in
+    # a rebuilt database when the parquet files change; None disables it
+    DATA_RELOAD_INTERVAL: float | None = 60.0
 
     # Data limits
     MAX_SELECTION_RECORDS: int = 1000
     MAX_DISPLAY_RECORDS: int = 100
 
+    # Shared cache of materialized map datasets and color arrays; each worker
+    # process started by start.py gets an equal share of the byte budget
+    RESULT_CACHE_MAX_ENTRIES: int = 256
+    RESULT_CACHE_MAX_BYTES: int = 1_000_000_000
+
+    # Level of detail: below LOD_POINT_ZOOM the map shows hexagon bins sized to
+    # roughly LOD_CELL_PIXELS on screen; zoomed in, selections above
+    # LOD_MAX_POINTS rows stream viewport points instead of loading every point
+    LOD_MAX_POINTS: int = 250_000
+    LOD_POINT_ZOOM: int = 12
+    LOD_CELL_PIXELS: int = 24
+    BIN_COLOR_PALETTE: str = "bmy"
+
+    # Viewport streaming: zoomed in on large selections, only points in tiles
+    # around the viewport are loaded, capped at VIEWPORT_POINT_BUDGET rows
+    VIEWPORT_POINT_BUDGET: int = 200_000
+    # Fraction of the viewport size loaded beyond each edge
+    VIEWPORT_MARGIN: float = 0.25
+    # Assumed map width in pixels; the height is MAP_HEIGHT
+    VIEWPORT_WIDTH: int = 1600
+    # Tiles are this many zoom levels coarser than the view
+    VIEWPORT_TILE_ZOOM_OFFSET: int = 2
+    VIEW_STATE_DEBOUNCE_MS: int = 250
+
+    # Offline tile pyramid: Arrow IPC point tiles per year and z/x/y, built by
+    # `python -m boston311.tile_pyramid` and served under /TILE_ROUTE/
+    TILE_PYRAMID_PATH: Path = Path("data/tiles")
+    TILE_PYRAMID_ZOOMS: tuple[int, ...] = (10, 11, 12)
+    TILE_ROUTE: str = "tiles"
+
     # Color configuration
     DEFAULT_POINT_COLOR: tuple[int, int, int, int] = (255, 140, 0, 255)
     NULL_VALUE_COLOR: tuple[int, int, int] = (128, 128, 128)
@@ -35,6 +124,9 @@ class AppConfig:
     # Time period configuration
     MIN_YEAR: int = 2011
     RECENT_YEARS_COUNT: int = 6
+    # Relative periods ("Last 30 Days", ...) end at the next "day" or "hour"
+    # boundary, so their bounds and cache keys only change when it passes
+    TIME_PERIOD_RESOLUTION: str = "day"
 
 
 # Global configuration instance
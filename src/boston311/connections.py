@@ -0,0 +1,127 @@
+"""Per-session DuckDB cursors on the shared read-only database."""
+
+import threading
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+import duckdb
+import panel as pn
+
+from boston311.database import get_connection, open_cursor, query_executor
+from boston311.lazy import lazy
+from boston311.logging_utils import get_logger
+
+log = get_logger(name="connections")
+
+T = TypeVar("T")
+
+
+class SessionClosedError(RuntimeError):
+    """Raised for a query on a session cursor after its session ended."""
+
+
+class SessionCursor:
+    """A session's cursor, reopened on the current base connection after a reload.
+
+    Queries run through :meth:`execute`, which holds the cursor for their
+    duration; the dashboard additionally serializes them per session.
+    """
+
+    def __init__(self, get_base: Callable[[], duckdb.DuckDBPyConnection]):
+        self._get_base = get_base
+        self._base: duckdb.DuckDBPyConnection | None = None
+        self._cursor: duckdb.DuckDBPyConnection | None = None
+        # Held while a query uses the cursor, so it is never closed under one
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def cursor(self) -> duckdb.DuckDBPyConnection:
+        """The cursor, replaced first if the base connection was swapped.
+
+        Raises:
+            SessionClosedError: If the session cursor was closed
+        """
+        if self._closed:
+            raise SessionClosedError("Session cursor is closed")
+        base = self._get_base()
+        if self._cursor is None or self._base is not base:
+            if self._cursor is not None:
+                self._cursor.close()
+                log.info("Reopened session cursor on the reloaded database")
+            self._cursor = open_cursor(base)
+            self._base = base
+        return self._cursor
+
+    def execute(self, func: Callable[..., T], *args: Any) -> T:
+        """Run ``func(cursor, *args)`` while holding the cursor."""
+        with self._lock:
+            return func(self.cursor, *args)
+
+    def interrupt(self) -> None:
+        """Interrupt the query running on the cursor, if any."""
+        cursor = self._cursor
+        if cursor is not None:
+            cursor.interrupt()
+
+    def close(self) -> None:
+        """Refuse further queries, interrupt the running one and close the cursor.
+
+        The cursor is closed on the query thread pool once the interrupted query
+        has released it, so the caller doesn't wait for it.
+        """
+        self._closed = True
+        self.interrupt()
+        query_executor.submit(self._close_cursor)
+
+    def _close_cursor(self) -> None:
+        with self._lock:
+            if self._cursor is not None:
+                self._cursor.close()
+                self._cursor = None
+
+
+class ConnectionManager:
+    """Hands out cursors on a shared base connection and closes them with their session.
+
+    Cursors are independent connections to the same database instance, so
+    sessions can query concurrently while sharing the attached file, its
+    buffer pool and DuckDB's worker threads. The base connection is looked up
+    on every query, so a reloaded database is picked up by existing sessions;
+    the previous instance is freed once its last cursor is closed.
+    """
+
+    def __init__(self, get_base: Callable[[], duckdb.DuckDBPyConnection]):
+        self._get_base = get_base
+        self._sessions: set[SessionCursor] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def acquire(self) -> SessionCursor:
+        """Open a cursor, released automatically when the current session ends."""
+        session = SessionCursor(self._get_base)
+        with self._lock:
+            self._sessions.add(session)
+
+        if pn.state.curdoc and pn.state.curdoc.session_context:
+            pn.state.on_session_destroyed(lambda _: self.release(session))
+        log.info(f"Opened session cursor ({len(self)} active)")
+        return session
+
+    def release(self, session: SessionCursor) -> None:
+        """Interrupt any running query on the session's cursor and close it."""
+        with self._lock:
+            if session not in self._sessions:
+                return
+            self._sessions.remove(session)
+
+        session.close()
+        log.info(f"Closed session cursor ({len(self)} active)")
+
+
+@lazy
+def get_connection_manager() -> ConnectionManager:
+    """Process-wide manager for the dashboard sessions, created on first use."""
+    return ConnectionManager(get_connection)
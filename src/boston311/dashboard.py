@@ -1,24 +1,58 @@
 """Main dashboard component for the Boston 311 application."""
 
-from typing import Literal, cast
+import asyncio
+import threading
+from collections.abc import Callable
+from functools import partial
+from typing import Any, TypeVar, cast
 
 import duckdb
 import panel as pn
 import param
-from lonboard._layer import ScatterplotLayer
+import pyarrow as pa
+from lonboard._layer import ColumnLayer, ScatterplotLayer
 from lonboard._map import Map
 from lonboard._viewport import compute_view
 
-from boston311.color_mapping import map_column_to_color
+from boston311.color_mapping import dataset_colors
 from boston311.config import config
-from boston311.database import con, get_neighborhoods, get_sources, get_subjects
+from boston311.connections import SessionClosedError, get_connection_manager
+from boston311.database import (
+    bin_cell_size,
+    count_points,
+    data_version,
+    fetch_bins,
+    fetch_points,
+    fetch_dataframe,
+    fetch_viewport_points,
+    get_dimension_options,
+    on_reload,
+    remove_reload_callback,
+    run_query,
+)
 from boston311.logging_utils import get_logger
-from boston311.sql_utils import SQLUtils
-from boston311.time_periods import TIME_PERIODS
-from boston311.ui_components import create_color_legend, create_table_view
+from boston311.sql_utils import FilterState, QueryBuilder
+from boston311.tiles import Tile, viewport_tiles
+from boston311.time_periods import (
+    DEFAULT_TIME_PERIOD,
+    current_time_periods,
+    resolve_time_period,
+)
+from boston311.ui_components import (
+    create_color_legend,
+    create_selector_options,
+    create_table_view,
+)
 
 log = get_logger(name="dashboard")
 
+T = TypeVar("T")
+
+
+class SupersededQueryError(Exception):
+    """Raised for a data query that a newer request made obsolete."""
+
+
 pn.extension("ipywidgets")
 
 # Dashboard description
@@ -51,23 +85,18 @@ class StateViewer(pn.viewable.Viewer):
     lb_map = cast(
         Map, param.ClassSelector(class_=Map, doc="The map object", constant=True)
     )
+    # Options are filled in per session, so defining the class runs no queries
     time_period = cast(
         str,
         param.Selector(
-            default="Year to Date",
-            objects=list(TIME_PERIODS.keys()),
+            default=DEFAULT_TIME_PERIOD,
+            objects=[DEFAULT_TIME_PERIOD],
             doc="Time period to display data for",
         ),
     )
-    neighborhood = param.Selector(
-        default="All", objects=get_neighborhoods(con, *TIME_PERIODS["Year to Date"])
-    )
-    source = param.Selector(
-        default="All", objects=get_sources(con, *TIME_PERIODS["Year to Date"])
-    )
-    subject = param.Selector(
-        default="All", objects=get_subjects(con, *TIME_PERIODS["Year to Date"])
-    )
+    neighborhood = param.Selector(default="All", objects=["All"])
+    source = param.Selector(default="All", objects=["All"])
+    subject = param.Selector(default="All", objects=["All"])
     color_column = cast(
         str,
         param.Selector(
@@ -78,9 +107,37 @@ class StateViewer(pn.viewable.Viewer):
     alpha = cast(float, param.Number(default=0.8, bounds=config.ALPHA_BOUNDS))
     size = cast(int, param.Number(default=5, bounds=config.SIZE_BOUNDS))
     query = cast(str, param.String(default="SELECT * FROM requests"))
+    zoom = cast(
+        int,
+        param.Integer(default=10, bounds=(0, 24), doc="Integer map zoom level"),
+    )
+    tiles = cast(
+        tuple[Tile, ...],
+        param.ClassSelector(
+            class_=tuple,
+            default=(),
+            doc="Tiles covering the map viewport and its margin",
+        ),
+    )
+    binned = cast(
+        bool,
+        param.Boolean(
+            default=False,
+            doc="Whether the map shows hexagon bins instead of points",
+            constant=False,
+        ),
+    )
+    truncated = cast(
+        bool,
+        param.Boolean(
+            default=False,
+            doc="Whether viewport points were capped at VIEWPORT_POINT_BUDGET",
+            constant=False,
+        ),
+    )
     data = param.Parameter(
         default=None,
-        doc="The DuckDB relation object",
+        doc="Arrow table of the points or bins matching the current filters",
         constant=False,
     )
     color_legend = cast(
@@ -94,7 +151,7 @@ class StateViewer(pn.viewable.Viewer):
     selected_data = param.Parameter(
         default=None,
         allow_None=True,
-        doc="Selected data for table view",
+        doc="DataFrame of the selected rows for the table view",
         constant=False,
     )
     show_table = cast(
@@ -107,6 +164,28 @@ class StateViewer(pn.viewable.Viewer):
     )
 
     def __init__(self, **params):
+        # Rendered layer and its row ids, aligned with the layer's row order
+        self._layer: ScatterplotLayer | ColumnLayer | None = None
+        self._row_ids: pa.ChunkedArray | None = None
+        # Filters the view was last fitted to, so zooming doesn't re-center
+        self._view_filters: FilterState | None = None
+        # Identifies the loaded data, so view changes that don't alter it are free
+        self._data_key: tuple | None = None
+        # Latest map view state and the pending debounce callback applying it
+        self._view_state: Any = None
+        self._view_state_callback: Any = None
+        # Session cursor; queries run on the shared thread pool one at a time,
+        # queued on the event loop so they don't hold pool threads while waiting
+        self._session = get_connection_manager().acquire()
+        self._query_lock = asyncio.Lock()
+        # Incremented per data and option request so stale results are dropped;
+        # the generation of the data query on the cursor can be interrupted
+        self._generation = 0
+        self._options_generation = 0
+        self._running_generation: int | None = None
+        # Guards the running generation, so only the query it names is interrupted
+        self._running_lock = threading.Lock()
+
         params["lb_map"] = params.get(
             "lb_map",
             Map(
@@ -122,11 +201,25 @@ class StateViewer(pn.viewable.Viewer):
         )
 
         super().__init__(**params)
+        self.param.time_period.objects = list(current_time_periods())
 
         # Set up bounding box selection observer
         self.lb_map.observe(
             self._handle_bbox_selection_change, names=["selected_bounds"]
         )
+        # Track the zoom level to pick the level of detail
+        self.lb_map.observe(self._handle_view_state_change, names=["view_state"])
+
+        # Load the data again from a hot-reloaded database; the level of detail
+        # key carries the data version, so the held data is always replaced
+        doc = pn.state.curdoc
+        if doc and doc.session_context:
+
+            def refresh() -> None:
+                doc.add_next_tick_callback(self._update_data)
+
+            on_reload(refresh)
+            pn.state.on_session_destroyed(lambda _: remove_reload_callback(refresh))
 
         self.description = pn.pane.Markdown(description, margin=5)
 
@@ -157,13 +250,13 @@ class StateViewer(pn.viewable.Viewer):
             margin=5,
         )
 
+        self.map_pane = pn.pane.IPyWidget(self.lb_map, sizing_mode="stretch_both")
+
         self.view = pn.Column(
             self._title,
+            self._truncation_notice,
             pn.Row(
-                pn.pane.IPyWidget(
-                    self.lb_map,
-                    sizing_mode="stretch_both",
-                ),
+                self.map_pane,
                 pn.Column(
                     pn.pane.Markdown("### Legend", margin=(10, 10, 5, 10)),
                     self._color_legend,
@@ -184,100 +277,235 @@ class StateViewer(pn.viewable.Viewer):
             sizing_mode="stretch_width",
         )
 
-    def _build_filter_conditions(self) -> list[str]:
-        """Build common filter conditions based on current selections."""
-        conditions = ["geometry IS NOT NULL"]
-
-        # Add time period filtering
-        start_date, end_date = TIME_PERIODS[self.time_period]
-        conditions.append(f"open_dt >= '{start_date}' AND open_dt < '{end_date}'")
-
-        # Add neighborhood filter
-        if self.neighborhood != "All" and isinstance(self.neighborhood, str):
-            escaped_neighborhood = SQLUtils.escape_sql_string(self.neighborhood)
-            conditions.append(f"neighborhood = '{escaped_neighborhood}'")
-
-        # Add source filter
-        if self.source != "All" and isinstance(self.source, str):
-            escaped_source = SQLUtils.escape_sql_string(self.source)
-            conditions.append(f"source = '{escaped_source}'")
-
-        # Add subject filter
-        if self.subject != "All" and isinstance(self.subject, str):
-            escaped_subject = SQLUtils.escape_sql_string(self.subject)
-            conditions.append(f"subject = '{escaped_subject}'")
+        # param calls on_init methods without awaiting coroutines, so the first
+        # options and data are scheduled here instead
+        pn.state.execute(self._update_time_period)
+        pn.state.execute(self._update_data)
+
+    def _filter_state(self) -> FilterState:
+        """Build the normalized filter state for the current selections."""
+        return FilterState.from_selection(
+            resolve_time_period(self.time_period),
+            self.neighborhood,
+            self.source,
+            self.subject,
+        )
 
-        return conditions
+    async def _query(
+        self, func: Callable[..., T], *args: Any, generation: int | None = None
+    ) -> T:
+        """Run ``func(cursor, *args)`` on the query thread pool with the session cursor.
 
-    @param.depends("time_period", watch=True, on_init=True)
-    def _update_time_period(self):
+        A session's queries wait for each other on the event loop, so a burst of
+        changes in one session occupies at most one pool thread. Queries tagged
+        with a data request ``generation`` are skipped with
+        :class:`SupersededQueryError` if a newer request arrived while they were
+        queued, and can be interrupted by :meth:`_cancel_stale_query`.
+        """
+        async with self._query_lock:
+            if generation is not None and generation != self._generation:
+                raise SupersededQueryError(generation)
+            with self._running_lock:
+                self._running_generation = generation
+            try:
+                return await run_query(self._session.execute, func, *args)
+            finally:
+                with self._running_lock:
+                    self._running_generation = None
+
+    def _cancel_stale_query(self):
+        """Interrupt the data query running on the session cursor, if it is stale."""
+        with self._running_lock:
+            running = self._running_generation
+            if running is not None and running != self._generation:
+                log.info(f"Interrupting superseded query {running}")
+                self._session.interrupt()
+
+    @param.depends("time_period", watch=True)
+    async def _update_time_period(self):
         """Update the selector options for the selected time period."""
-        start_date, end_date = TIME_PERIODS[self.time_period]
+        start_date, end_date = resolve_time_period(self.time_period)
+        self._options_generation += 1
+        generation = self._options_generation
 
         # Update the selector options since the available values might have changed
-        self.param.neighborhood.objects = get_neighborhoods(con, start_date, end_date)
-        self.param.source.objects = get_sources(con, start_date, end_date)
-        self.param.subject.objects = get_subjects(con, start_date, end_date)
-
-        # Reset filters to "All" when time period changes to avoid invalid selections
-        self.neighborhood = "All"
-        self.source = "All"
-        self.subject = "All"
+        try:
+            options = await self._query(get_dimension_options, start_date, end_date)
+        except (duckdb.InterruptException, SessionClosedError):
+            log.warning(f"Loading the options for {self.time_period} was interrupted")
+            return
+        if generation != self._options_generation:
+            return
+        self.param.neighborhood.objects = create_selector_options(
+            options["neighborhood"]
+        )
+        self.param.source.objects = create_selector_options(options["source"])
+        self.param.subject.objects = create_selector_options(options["subject"])
+
+        # Reset filters to "All" when time period changes to avoid invalid
+        # selections, in one update so the data is only reloaded once
+        self.param.update(neighborhood="All", source="All", subject="All")
+
+    @staticmethod
+    def _level_of_detail(
+        cursor: duckdb.DuckDBPyConnection,
+        filters: FilterState,
+        zoom: int,
+        tiles: tuple[Tile, ...],
+    ) -> tuple:
+        """Pick what to load for the filters at a view.
+
+        Zoomed out the map shows bins; zoomed in it shows every point of small
+        selections, and only the points around the viewport of large ones. The
+        key includes the cursor's data version, so data and colors loaded from
+        a database a reload replaced are never mistaken for the current ones.
+        """
+        version = data_version(cursor)
+        if zoom < config.LOD_POINT_ZOOM:
+            return ("bins", version, filters, zoom)
+        if count_points(cursor, filters) <= config.LOD_MAX_POINTS or not tiles:
+            return ("points", version, filters)
+        return ("viewport", version, filters, tiles)
+
+    @staticmethod
+    def _load(cursor: duckdb.DuckDBPyConnection, key: tuple) -> pa.Table:
+        """Load the data identified by a level of detail key."""
+        kind, _, filters, *view = key
+        if kind == "bins":
+            return fetch_bins(cursor, filters, *view)
+        if kind == "viewport":
+            return fetch_viewport_points(cursor, filters, *view)
+        return fetch_points(cursor, filters)
 
     @param.depends(
-        "time_period", "neighborhood", "source", "subject", watch=True, on_init=True
+        "time_period",
+        "neighborhood",
+        "source",
+        "subject",
+        "zoom",
+        "tiles",
+        watch=True,
     )
-    def _update_data(self):
-        """Build dynamic SQL query based on current filters - cached by parameters"""
-        where_conditions = self._build_filter_conditions()
-        where_clause = " AND ".join(where_conditions)
-
-        query = f"""
-            SELECT 
-            source,
-            subject,
-            neighborhood,
-            open_dt,
-            geometry,
-            FROM requests 
-            WHERE {where_clause}
-            ORDER BY open_dt DESC
+    async def _update_data(self):
+        """Load the data for the current filters and view - shared via the result cache"""
+        self._generation += 1
+        generation = self._generation
+        self._cancel_stale_query()
+
+        try:
+            key = await self._query(
+                self._level_of_detail,
+                self._filter_state(),
+                self.zoom,
+                self.tiles,
+                generation=generation,
+            )
+            # Panning within loaded tiles or zooming in on all points changes nothing
+            if generation != self._generation or key == self._data_key:
+                return
+
+            self.map_pane.loading = True
+            data = await self._query(self._load, key, generation=generation)
+        except (SupersededQueryError, duckdb.InterruptException, SessionClosedError):
+            log.info(f"Dropped superseded data request {generation}")
+            return
+        finally:
+            if generation == self._generation:
+                self.map_pane.loading = False
+
+        # A newer request superseded this one while it was running
+        if generation != self._generation:
+            return
+
+        self._data_key = key
+        self.binned = key[0] == "bins"
+        self.truncated = (
+            key[0] == "viewport" and data.num_rows >= config.VIEWPORT_POINT_BUDGET
+        )
+        self.data = data
+
+    def _fill_color(self) -> Any:
+        """Compute the fill colors for the current data and update the legend.
+
+        Colors are fully opaque; transparency is applied through the layer's
+        opacity so alpha changes don't need new color buffers.
         """
-        log.info(f"Query: {query}")
-        self.data = con.sql(query)
+        if not isinstance(self.data, pa.Table) or (
+            not self.binned and self.color_column == "None"
+        ):
+            self.color_legend = {}  # Clear legend when no color column
+            return [*config.DEFAULT_POINT_COLOR[:3], 255]
+
+        column = "count" if self.binned else self.color_column
+        get_fill_color, legend_data = dataset_colors(self._data_key, self.data, column)
+        self.color_legend = legend_data
+        return get_fill_color
 
-    @param.depends("data", "color_column", "alpha", "size", watch=True)
+    @param.depends("data", watch=True)
     def _update_value(self):
-        # Type guard to ensure data is available and is a DuckDB relation
-        if self.data is None or not isinstance(self.data, duckdb.DuckDBPyRelation):
+        """Rebuild the map layer when the filtered data changes."""
+        # Type guard to ensure data is available and is an Arrow table
+        if self.data is None or not isinstance(self.data, pa.Table):
             return
 
-        if self.color_column == "None":
-            get_fill_color = [*config.DEFAULT_POINT_COLOR[:3], int(self.alpha * 255)]
-            self.color_legend = {}  # Clear legend when no color column
-        else:
-            get_fill_color, legend_data = map_column_to_color(
-                self.data,
-                cast(Literal["source", "subject", "neighborhood"], self.color_column),
-                self.alpha,
-                return_legend=True,
+        # lonboard panics on empty layers, past the usual exception handling
+        if self.data.num_rows == 0:
+            self._layer = None
+            self._row_ids = None
+            self.color_legend = {}
+            self.lb_map.layers = []
+            return
+
+        if self.binned:
+            _, _, radius = bin_cell_size(self.zoom)
+            self._row_ids = None
+            self._layer = ColumnLayer(
+                table=self.data,
+                get_fill_color=self._fill_color(),
+                opacity=self.alpha,
+                radius=radius,
+                disk_resolution=6,
+                angle=90,
+                extruded=False,
             )
-            self.color_legend = legend_data
+            self.lb_map.layers = [self._layer]
+            return
 
-        layer = ScatterplotLayer.from_duckdb(
-            self.data,
-            get_fill_color=get_fill_color,
+        # Keep the row ids server-side so a click resolves to a primary key lookup
+        self._row_ids = self.data.column("row_id")
+        layer = ScatterplotLayer(
+            table=self.data.drop_columns(["row_id"]),
+            get_fill_color=self._fill_color(),
+            opacity=self.alpha,
             pickable=True,
             get_radius=self.size,
             auto_highlight=True,
-            crs="EPSG:4326",
         )
 
         # Set up selection observer for point clicks
         layer.observe(self._handle_point_selection, names=["selected_index"])
 
+        self._layer = layer
         self.lb_map.layers = [layer]
 
+    @param.depends("color_column", watch=True)
+    def _update_colors(self):
+        """Push a new color buffer without touching the geometry."""
+        if self._layer is not None and not self.binned:
+            self._layer.get_fill_color = self._fill_color()
+
+    @param.depends("alpha", watch=True)
+    def _update_alpha(self):
+        """Apply transparency as a layer property."""
+        if self._layer is not None:
+            self._layer.opacity = self.alpha
+
+    @param.depends("size", watch=True)
+    def _update_size(self):
+        """Apply the point radius as a layer property."""
+        if isinstance(self._layer, ScatterplotLayer):
+            self._layer.get_radius = self.size
+
     def _handle_point_selection(self, change):
         """Handle point selection from the layer."""
         selected_index = change.get("new")
@@ -288,32 +516,51 @@ class StateViewer(pn.viewable.Viewer):
             self.selected_data = None
             return
 
-        # Build query to get the specific selected row
-        where_conditions = self._build_filter_conditions()
-        where_clause = " AND ".join(where_conditions)
-
-        # Create a query to get the specific selected row
-        query = f"""
-            WITH numbered_data AS (
-                SELECT *, ROW_NUMBER() OVER (ORDER BY open_dt DESC) - 1 as row_index
-                FROM (
-                    SELECT 
-                        source,
-                        subject,
-                        neighborhood,
-                        open_dt,
-                        geometry
-                    FROM requests 
-                    WHERE {where_clause}
-                    ORDER BY open_dt DESC
-                )
-            )
-            SELECT * FROM numbered_data WHERE row_index = {selected_index}
-        """
+        if self._row_ids is None or selected_index >= len(self._row_ids):
+            log.warning(f"No row id for selected index: {selected_index}")
+            return
 
-        self.selected_data = con.sql(query)
+        # Resolve the clicked point to its row id and look it up directly
+        row_id = self._row_ids[selected_index].as_py()
+        query, params = QueryBuilder.row_by_id(row_id)
+        pn.state.execute(partial(self._load_selection, query, params))
+        log.info(f"Point selection requested for index: {selected_index}")
+
+    async def _load_selection(self, query: str, params: list[Any]):
+        """Fetch the selected rows off the event loop and show them in the table."""
+        try:
+            self.selected_data = await self._query(fetch_dataframe, query, params)
+        except (duckdb.InterruptException, SessionClosedError):
+            log.warning("Loading the selected rows was interrupted")
+            return
         self.show_table = True
-        log.info(f"Point selection successful for index: {selected_index}")
+
+    def _handle_view_state_change(self, change):
+        """Apply the map's view state once it has settled."""
+        self._view_state = change.get("new")
+        if self._view_state_callback is not None:
+            self._view_state_callback.stop()
+        self._view_state_callback = pn.state.add_periodic_callback(
+            self._apply_view_state, period=config.VIEW_STATE_DEBOUNCE_MS, count=1
+        )
+
+    def _apply_view_state(self):
+        """Update the zoom level and viewport tiles from the latest view state."""
+        view_state = self._view_state
+        if view_state is None:
+            return
+
+        zoom = max(0, min(24, int(view_state.zoom)))
+        tiles = viewport_tiles(
+            view_state.longitude,
+            view_state.latitude,
+            view_state.zoom,
+            config.VIEWPORT_WIDTH,
+            config.MAP_HEIGHT,
+            tile_zoom=max(0, zoom - config.VIEWPORT_TILE_ZOOM_OFFSET),
+            margin=config.VIEWPORT_MARGIN,
+        )
+        self.param.update(zoom=zoom, tiles=tiles)
 
     def _handle_bbox_selection_change(self, change):
         """Handle bounding box selection change from the map."""
@@ -328,33 +575,11 @@ class StateViewer(pn.viewable.Viewer):
             self.selected_data = None
             return
 
-        minx, miny, maxx, maxy = bounds
         log.info(f"Bounding box selected: {bounds}")
 
-        # Build base filter conditions and add spatial filter
-        where_conditions = self._build_filter_conditions()
-        where_conditions.append(f"""
-            ST_X(geometry) BETWEEN {minx} AND {maxx} 
-            AND ST_Y(geometry) BETWEEN {miny} AND {maxy}
-        """)
-
-        where_clause = " AND ".join(where_conditions)
-        query = f"""
-            SELECT 
-                source,
-                subject,
-                neighborhood,
-                open_dt,
-                geometry
-            FROM requests 
-            WHERE {where_clause}
-            ORDER BY open_dt DESC
-            LIMIT {config.MAX_SELECTION_RECORDS}
-        """
-
-        self.selected_data = con.sql(query)
-        self.show_table = True
-        log.info("Bounding box selection successful")
+        query, params = QueryBuilder.bbox_selection(self._filter_state(), bounds)
+        pn.state.execute(partial(self._load_selection, query, params))
+        log.info("Bounding box selection requested")
 
     @param.depends("data", watch=True)
     def _fly_to_center(self):
@@ -362,6 +587,12 @@ class StateViewer(pn.viewable.Viewer):
         if not self.lb_map.layers:
             return
 
+        # Only fit the view to new filters; level of detail changes keep it
+        filters = self._filter_state()
+        if filters == self._view_filters:
+            return
+        self._view_filters = filters
+
         computed_view_state = compute_view(self.lb_map.layers)
         log.info(f"Computed view state: {computed_view_state}")
         self.lb_map.set_view_state(**computed_view_state)
@@ -376,6 +607,17 @@ class StateViewer(pn.viewable.Viewer):
         """Create a modern color legend widget for the sidebar."""
         return create_color_legend(self.color_legend, self.color_column)
 
+    @param.depends("truncated")
+    def _truncation_notice(self):
+        """Tell the user when only the newest viewport points are shown."""
+        return pn.pane.Alert(
+            f"Showing the newest {config.VIEWPORT_POINT_BUDGET:,} requests around "
+            "the map view. Zoom in or narrow the filters to see all of them.",
+            alert_type="info",
+            visible=self.truncated,
+            margin=(0, 10),
+        )
+
     def _title(self):
         """Generate a simple, friendly title."""
         return "# Boston 311 Dashboard"
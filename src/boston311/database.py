@@ -1,40 +1,392 @@
 """Database operations for the Boston 311 dashboard."""
 
+import asyncio
+import fcntl
+import glob
+import hashlib
+import math
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, suppress
 from pathlib import Path
+from typing import Any, TypeVar
 
 import duckdb
-import panel as pn
+import pandas as pd
+import pyarrow as pa
 
 from boston311.config import config
-from boston311.sql_utils import SQLUtils
+from boston311.geoarrow import METERS_PER_DEGREE, lonlat_to_points
+from boston311.lazy import lazy
+from boston311.logging_utils import get_logger
+from boston311.result_cache import result_cache
+from boston311.sql_utils import FILTER_COLUMNS, FilterState, QueryBuilder
+from boston311.tile_pyramid import TilePyramid
+from boston311.tiles import Tile
 
+log = get_logger(name="database")
 
-@pn.cache
-def init_duckdb(file_path: Path) -> duckdb.DuckDBPyConnection:
-    """Initialize DuckDB connection with spatial extension and load data.
+T = TypeVar("T")
+
+# Catalog name the persisted database file is attached under
+DATABASE_ALIAS = "boston311"
+
+# Set by start.py for server workers, which must find the database prebuilt
+PREBUILT_ENV = "BOSTON311_DATABASE_PREBUILT"
+
+# Set by start.py to each server worker's share of the DuckDB threads and memory
+THREADS_ENV = "BOSTON311_DUCKDB_THREADS"
+MEMORY_LIMIT_ENV = "BOSTON311_DUCKDB_MEMORY_LIMIT"
+
+
+def compute_source_fingerprint(file_path: Path) -> str:
+    """Compute a fingerprint of the parquet input files and the ingest schema.
 
     Args:
-        file_path: Path to the parquet files
+        file_path: Glob pattern of the parquet files
 
     Returns:
-        DuckDB connection object
+        Hex digest over the ingest settings and the name, size and modification
+        time of every file
     """
-    con = duckdb.connect()
+    digest = hashlib.sha256()
+    ingest_spec = (
+        config.INGEST_COLUMNS,
+        config.ENUM_COLUMNS,
+        config.INGEST_WIDE,
+        config.INGEST_EXCLUDE_COLUMNS,
+        config.SORT_COLUMNS,
+        config.ROW_GROUP_SIZE,
+        config.SPATIAL_INDEX,
+    )
+    digest.update(f"{ingest_spec!r}\n".encode())
+    for source in sorted(glob.glob(str(file_path))):
+        stat = os.stat(source)
+        digest.update(
+            f"{Path(source).name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode()
+        )
+    return digest.hexdigest()
+
+
+def _load_spatial(con: duckdb.DuckDBPyConnection) -> None:
+    """Install and load the DuckDB spatial extension on a connection."""
     con.install_extension("spatial")
     con.load_extension("spatial")
 
-    # Load all data without time filtering - using Path directly is safe here
-    con.sql(f"CREATE TABLE requests AS SELECT * FROM '{file_path}'")
+
+def connect_database(database_path: Path) -> duckdb.DuckDBPyConnection:
+    """Attach a persisted database file read-only.
+
+    The file is attached to an in-memory connection so the spatial extension is
+    loaded before the catalog (and its geometry columns) is read.
+
+    Args:
+        database_path: Path to the DuckDB database file
+
+    Returns:
+        DuckDB connection with the database attached and selected
+    """
+    con = duckdb.connect()
+    _load_spatial(con)
+    threads = os.environ.get(THREADS_ENV) or config.DUCKDB_THREADS
+    if threads is not None:
+        con.sql(f"SET threads = {int(threads)}")
+    memory_limit = os.environ.get(MEMORY_LIMIT_ENV) or config.DUCKDB_MEMORY_LIMIT
+    if memory_limit is not None:
+        con.execute("SET memory_limit = ?", [memory_limit])
+    con.sql(f"ATTACH '{database_path}' AS {DATABASE_ALIAS} (READ_ONLY)")
+    con.sql(f"USE {DATABASE_ALIAS}")
     return con
 
 
-@pn.cache
-def get_neighborhoods(
+def open_cursor(con: duckdb.DuckDBPyConnection) -> duckdb.DuckDBPyConnection:
+    """Open a cursor on the shared database, e.g. for one dashboard session.
+
+    Cursors are separate connections to the same database instance, so they can
+    run queries concurrently with each other.
+    """
+    cursor = con.cursor()
+    cursor.sql(f"USE {DATABASE_ALIAS}")
+    return cursor
+
+
+async def run_query(func: Callable[..., T], *args: Any) -> T:
+    """Run a blocking query function on the query thread pool.
+
+    Awaiting the result keeps the server's event loop free for other sessions
+    while DuckDB works.
+    """
+    return await asyncio.wrap_future(query_executor.submit(func, *args))
+
+
+def read_build_info(database_path: Path) -> tuple[int, str] | None:
+    """Read the schema version and source fingerprint stamped into a database.
+
+    Args:
+        database_path: Path to the DuckDB database file
+
+    Returns:
+        Tuple of (schema_version, source_fingerprint), or None if the file is
+        missing or was not written by :func:`build_database`
+    """
+    if not database_path.exists():
+        return None
+
+    try:
+        con = connect_database(database_path)
+        try:
+            row = con.sql(
+                "SELECT schema_version, source_fingerprint FROM build_info"
+            ).fetchone()
+        finally:
+            con.close()
+    except duckdb.Error as e:
+        log.warning(f"Could not read build info from {database_path}: {e}")
+        return None
+
+    if row is None:
+        return None
+    return int(row[0]), str(row[1])
+
+
+def _build_ingest_query(file_path: Path) -> str:
+    """Build the SELECT that loads the parquet files with the ingest schema.
+
+    Only ``config.INGEST_COLUMNS`` are loaded unless ``config.INGEST_WIDE`` is
+    set, in which case every column except ``config.INGEST_EXCLUDE_COLUMNS`` is
+    kept. ``config.ENUM_COLUMNS`` are cast to the ENUM types created by
+    :func:`build_database` and rows are ordered by ``config.SORT_COLUMNS``.
+    Point coordinates are materialized as ``lon``/``lat`` DOUBLE columns so
+    spatial range filters don't need to decode the geometry, and every row gets
+    a stable ``row_id`` that follows the physical sort order.
+
+    Args:
+        file_path: Path to the parquet files
+
+    Returns:
+        SQL query string
+    """
+    casts = {column: f"{column}::{column}_enum" for column in config.ENUM_COLUMNS}
+    casts["open_dt"] = "open_dt::TIMESTAMP"
+    order_by = ", ".join(config.SORT_COLUMNS)
+    coordinates = "ST_X(geometry)::DOUBLE AS lon, ST_Y(geometry)::DOUBLE AS lat"
+    row_id = f"(row_number() OVER (ORDER BY {order_by}) - 1)::BIGINT AS row_id"
+
+    if config.INGEST_WIDE:
+        exclude = ", ".join(config.INGEST_EXCLUDE_COLUMNS)
+        replace = ", ".join(f"{expr} AS {column}" for column, expr in casts.items())
+        return (
+            f"SELECT {row_id}, * EXCLUDE ({exclude}) REPLACE ({replace}), "
+            f"{coordinates} FROM '{file_path}' ORDER BY row_id"
+        )
+
+    columns = ", ".join(
+        f"{casts[column]} AS {column}" if column in casts else column
+        for column in config.INGEST_COLUMNS
+    )
+    return (
+        f"SELECT {row_id}, {columns}, {coordinates} FROM '{file_path}' ORDER BY row_id"
+    )
+
+
+def _build_aggregate_query(file_path: Path, source_columns: list[str]) -> str:
+    """Build the SELECT for the per-day aggregate cube.
+
+    Rows are counted per (day, neighborhood, source, subject). Open/closed
+    counts and response time sums are only computed when the parquet files
+    carry ``case_status`` and ``closed_dt``; otherwise those columns are NULL.
+
+    Args:
+        file_path: Path to the parquet files
+        source_columns: Column names available in the parquet files
+
+    Returns:
+        SQL query string
+    """
+    dimensions = ", ".join(
+        f"{column}::{column}_enum AS {column}"
+        if column in config.ENUM_COLUMNS
+        else column
+        for column in FILTER_COLUMNS
+    )
+
+    if "case_status" in source_columns:
+        open_count = "count_if(case_status = 'Open')"
+    else:
+        open_count = "NULL::BIGINT"
+
+    if "closed_dt" in source_columns:
+        closed_count = "count(closed_dt)"
+        response_hours = (
+            "sum(date_diff('second', open_dt::TIMESTAMP, closed_dt::TIMESTAMP)) "
+            "/ 3600.0"
+        )
+    else:
+        closed_count = "NULL::BIGINT"
+        response_hours = "NULL::DOUBLE"
+
+    return f"""
+        SELECT
+            open_dt::DATE AS day,
+            {dimensions},
+            count(*) AS count,
+            {open_count} AS open_count,
+            {closed_count} AS closed_count,
+            {response_hours} AS response_hours_sum
+        FROM '{file_path}'
+        GROUP BY ALL
+        ORDER BY ALL
+    """
+
+
+def build_database(file_path: Path, database_path: Path, fingerprint: str) -> None:
+    """Materialize the parquet files into a persisted DuckDB database file.
+
+    The database is written to a temporary file first and moved into place
+    atomically, so readers never observe a partially written file. Row groups
+    are sized by ``config.ROW_GROUP_SIZE`` so the sorted layout can be pruned,
+    and an R-tree index on ``geometry`` is persisted when
+    ``config.SPATIAL_INDEX`` is enabled. A ``daily_counts`` aggregate cube is
+    built alongside the ``requests`` table.
+
+    Args:
+        file_path: Path to the parquet files
+        database_path: Destination of the DuckDB database file
+        fingerprint: Source fingerprint to stamp into the database
+    """
+    database_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = database_path.with_name(f"{database_path.name}.{os.getpid()}.tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    log.info(f"Building {database_path} from {file_path}...")
+    try:
+        with duckdb.connect() as con:
+            _load_spatial(con)
+            con.sql(
+                f"ATTACH '{tmp_path}' AS build (ROW_GROUP_SIZE {config.ROW_GROUP_SIZE})"
+            )
+            con.sql("USE build")
+
+            for column in config.ENUM_COLUMNS:
+                con.sql(f"""
+                    CREATE TYPE {column}_enum AS ENUM (
+                        SELECT DISTINCT {column} FROM '{file_path}'
+                        WHERE {column} IS NOT NULL
+                        ORDER BY {column}
+                    )
+                """)
+
+            # Load all data without time filtering - using Path directly is safe here
+            con.sql(f"CREATE TABLE requests AS {_build_ingest_query(file_path)}")
+            if config.SPATIAL_INDEX:
+                log.info("Building R-tree index on requests.geometry...")
+                con.sql(
+                    "CREATE INDEX requests_geometry_idx ON requests "
+                    "USING RTREE (geometry)"
+                )
+
+            source_columns = con.sql(f"SELECT * FROM '{file_path}' LIMIT 0").columns
+            con.sql(
+                "CREATE TABLE daily_counts AS "
+                f"{_build_aggregate_query(file_path, source_columns)}"
+            )
+
+            con.execute(
+                """
+                CREATE TABLE build_info AS
+                SELECT
+                    ?::INTEGER AS schema_version,
+                    ?::VARCHAR AS source_fingerprint,
+                    current_timestamp AS built_at
+                """,
+                [config.SCHEMA_VERSION, fingerprint],
+            )
+            con.sql("USE memory")
+            con.sql("DETACH build")
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    os.replace(tmp_path, database_path)
+    log.info(f"Database written to {database_path}")
+
+
+@contextmanager
+def _build_lock(database_path: Path) -> Iterator[None]:
+    """Hold an exclusive lock on the database build, shared across processes."""
+    lock_path = database_path.with_name(f"{database_path.name}.lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def ensure_database(
+    file_path: Path, database_path: Path = config.DATABASE_PATH
+) -> None:
+    """Build the database file unless an up-to-date one exists.
+
+    Server workers started by ``start.py`` have ``PREBUILT_ENV`` set and fail
+    instead of each rebuilding the file the launcher was supposed to build.
+
+    Args:
+        file_path: Path to the parquet files
+        database_path: Path to the persisted DuckDB database file
+
+    Raises:
+        RuntimeError: If the database is missing or stale in a server worker
+    """
+    fingerprint = compute_source_fingerprint(file_path)
+    if read_build_info(database_path) == (config.SCHEMA_VERSION, fingerprint):
+        return
+
+    if os.environ.get(PREBUILT_ENV):
+        raise RuntimeError(
+            f"{database_path} is missing or stale in worker {os.getpid()}; "
+            "it must be built before the server starts"
+        )
+    with _build_lock(database_path):
+        if read_build_info(database_path) != (config.SCHEMA_VERSION, fingerprint):
+            build_database(file_path, database_path, fingerprint)
+
+
+def init_duckdb(
+    file_path: Path, database_path: Path = config.DATABASE_PATH
+) -> duckdb.DuckDBPyConnection:
+    """Initialize DuckDB connection with spatial extension and load data.
+
+    The ``requests`` table is persisted to ``database_path`` and only rebuilt
+    when the schema version or the parquet input fingerprint changes; otherwise
+    the existing file is attached read-only.
+
+    Args:
+        file_path: Path to the parquet files
+        database_path: Path to the persisted DuckDB database file
+
+    Returns:
+        DuckDB connection object
+    """
+    ensure_database(file_path, database_path)
+    log.info(f"Process {os.getpid()} attached {database_path}")
+    return connect_database(database_path)
+
+
+def get_dimension_options(
     con: duckdb.DuckDBPyConnection,
     start_date: str | None = None,
     end_date: str | None = None,
-) -> list[str]:
-    """Get list of available neighborhoods with optional time filtering.
+) -> dict[str, dict[str, int]]:
+    """Get the available values and row counts of every filter column.
+
+    All filter columns are aggregated in a single scan with GROUPING SETS, served
+    from the ``daily_counts`` cube whenever the time range is day-aligned.
+    Results are shared across sessions and cursors through ``result_cache``.
 
     Args:
         con: DuckDB connection
@@ -42,66 +394,310 @@ def get_neighborhoods(
         end_date: Optional end date filter
 
     Returns:
-        List of neighborhood names plus "All" option
+        Dictionary mapping each filter column to {value: row count}, sorted by value
     """
-    time_filter = SQLUtils.build_time_filter(start_date, end_date)
-    query = SQLUtils.build_distinct_column_query("neighborhood", time_filter)
 
-    df = con.sql(query).fetchdf()
-    if df is None or df.empty:
-        return ["All"]
-    return df["neighborhood"].tolist() + ["All"]
+    def query() -> dict[str, dict[str, int]]:
+        sql, params = QueryBuilder.dimension_counts(start_date, end_date)
+        options: dict[str, dict[str, int]] = {column: {} for column in FILTER_COLUMNS}
+        for dimension, value, count in con.sql(sql, params=params).fetchall():
+            options[dimension][value] = count
+        return options
+
+    key = ("dimensions", data_version(con), start_date, end_date)
+    return result_cache.get_or_compute(key, query)
 
 
-@pn.cache
-def get_sources(
+def query_aggregates(
     con: duckdb.DuckDBPyConnection,
-    start_date: str | None = None,
-    end_date: str | None = None,
-) -> list[str]:
-    """Get list of available sources with optional time filtering.
+    filters: FilterState,
+    group_by: tuple[str, ...] = (),
+) -> pa.Table:
+    """Aggregate request counts and response times from the daily cube.
 
     Args:
         con: DuckDB connection
-        start_date: Optional start date filter
-        end_date: Optional end date filter
+        filters: Normalized filter selection
+        group_by: Columns to group by ("day" and/or filter columns)
+
+    Returns:
+        Arrow table with the group keys and the summed ``AGGREGATE_MEASURES``
+    """
+    query, params = QueryBuilder.aggregate(filters, group_by)
+    return con.sql(query, params=params).arrow()
+
+
+def fetch_dataframe(
+    con: duckdb.DuckDBPyConnection, query: str, params: list[Any]
+) -> pd.DataFrame:
+    """Run a parameterized query and materialize the result as a DataFrame.
+
+    DuckDB converts ENUM columns to categoricals itself; their Arrow dictionary
+    arrays have unsigned indices, which pyarrow can't convert to pandas.
+    """
+    return con.sql(query, params=params).df()
+
+
+def _map_points(table: pa.Table) -> pa.Table:
+    """Convert ``lon``/``lat`` columns to map geometry at the configured precision."""
+    return lonlat_to_points(
+        table, config.COORDINATE_PRECISION_METERS, config.REFERENCE_LATITUDE
+    )
+
+
+def fetch_points(con: duckdb.DuckDBPyConnection, filters: FilterState) -> pa.Table:
+    """Materialize the map points matching the filters as an Arrow table.
+
+    Coordinates are returned as a GeoArrow point column built from the
+    ``lon``/``lat`` columns, so the table can be passed straight to a lonboard
+    layer. Results are shared across sessions through ``result_cache``, keyed
+    on the data version and the normalized filter state.
+
+    Args:
+        con: DuckDB connection
+        filters: Normalized filter selection
 
     Returns:
-        List of source names plus "All" option
+        Arrow table of the matching points, newest first
     """
-    time_filter = SQLUtils.build_time_filter(start_date, end_date)
-    query = SQLUtils.build_distinct_column_query("source", time_filter)
 
-    df = con.sql(query).fetchdf()
-    if df is None or df.empty:
-        return ["All"]
-    return df["source"].tolist() + ["All"]
+    def query() -> pa.Table:
+        sql, params = QueryBuilder.points(filters)
+        return _map_points(con.sql(sql, params=params).arrow())
+
+    return result_cache.get_or_compute(("points", data_version(con), filters), query)
 
 
-@pn.cache
-def get_subjects(
+def fetch_tile_points(
     con: duckdb.DuckDBPyConnection,
-    start_date: str | None = None,
-    end_date: str | None = None,
-) -> list[str]:
-    """Get list of available subjects with optional time filtering.
+    filters: FilterState,
+    tile: Tile,
+    version: str | None = None,
+) -> pa.Table:
+    """Materialize the newest points matching the filters inside one tile.
+
+    At most ``VIEWPORT_POINT_BUDGET`` rows are loaded, from the offline tile
+    pyramid when it has the tile's zoom level and from DuckDB otherwise. Tiles
+    are shared across sessions through ``result_cache``, so panning back
+    reuses them. ``version`` is the connection's :func:`data_version`, looked
+    up when not given.
+    """
+    version = version or data_version(con)
+
+    def query() -> pa.Table:
+        tile_pyramid = get_tile_pyramid()
+        # The pyramid belongs to the current database, which may be newer
+        if (
+            tile_pyramid is not None
+            and tile_pyramid.serves(tile)
+            and version == get_data_version()
+        ):
+            table = tile_pyramid.read(filters, tile, config.VIEWPORT_POINT_BUDGET)
+        else:
+            sql, params = QueryBuilder.bbox_points(
+                filters, tile.bounds, config.VIEWPORT_POINT_BUDGET
+            )
+            table = con.sql(sql, params=params).arrow()
+        return _map_points(table)
+
+    return result_cache.get_or_compute(("tile", version, filters, tile), query)
+
+
+def fetch_viewport_points(
+    con: duckdb.DuckDBPyConnection, filters: FilterState, tiles: tuple[Tile, ...]
+) -> pa.Table:
+    """Combine the points of the tiles covering a viewport.
 
     Args:
         con: DuckDB connection
-        start_date: Optional start date filter
-        end_date: Optional end date filter
+        filters: Normalized filter selection
+        tiles: Tiles covering the viewport and its margin
+
+    Returns:
+        Arrow table of at most ``VIEWPORT_POINT_BUDGET`` points, newest first,
+        in a single chunk
+    """
+    tile_pyramid = get_tile_pyramid()
+    if tile_pyramid is not None:
+        tiles = tile_pyramid.cover(tiles)
+
+    version = data_version(con)
+    tables = [fetch_tile_points(con, filters, tile, version) for tile in tiles]
+    # lonboard can't compute the bounds of a layer with zero-length chunks
+    table = pa.concat_tables(
+        [table for table in tables if table.num_rows] or tables[:1]
+    )
+    if table.num_rows > config.VIEWPORT_POINT_BUDGET:
+        table = table.sort_by([("row_id", "descending")])
+        table = table.slice(0, config.VIEWPORT_POINT_BUDGET)
+    return table.combine_chunks()
+
+
+def count_points(con: duckdb.DuckDBPyConnection, filters: FilterState) -> int:
+    """Count the rows matching the filters from the daily cube.
+
+    Days are counted whole, so the result is exact for day-aligned ranges and
+    an estimate otherwise - good enough to choose a level of detail.
+    """
+    count = query_aggregates(con, filters).column("count")[0].as_py()
+    return count or 0
+
+
+def bin_cell_size(zoom: int) -> tuple[float, float, float]:
+    """Size the hexagon grid so cells span about ``LOD_CELL_PIXELS`` at a zoom.
+
+    Returns:
+        Tuple of (column step in degrees of longitude, row pair step in degrees
+        of latitude, hexagon circumradius in meters)
+    """
+    width = config.LOD_CELL_PIXELS * 360 / (256 * 2**zoom)
+    # Ground distance between neighboring centers, in degrees of latitude
+    spacing = width * math.cos(math.radians(config.REFERENCE_LATITUDE))
+    return width, spacing * math.sqrt(3), spacing / math.sqrt(3) * METERS_PER_DEGREE
+
+
+def fetch_bins(
+    con: duckdb.DuckDBPyConnection, filters: FilterState, zoom: int
+) -> pa.Table:
+    """Aggregate the rows matching the filters into hexagon bins for a zoom level.
+
+    The payload depends on the covered area and zoom rather than the number of
+    rows, so it stays bounded for any date range. Results are shared across
+    sessions through ``result_cache``.
+
+    Args:
+        con: DuckDB connection
+        filters: Normalized filter selection
+        zoom: Integer map zoom level the cells are sized for
+
+    Returns:
+        Arrow table of bin centers (GeoArrow point ``geometry``) and ``count``,
+        with the busiest bins last so they draw on top
+    """
+
+    def query() -> pa.Table:
+        width, height, _ = bin_cell_size(zoom)
+        sql, params = QueryBuilder.bins(filters, width, height)
+        return _map_points(con.sql(sql, params=params).arrow())
+
+    return result_cache.get_or_compute(
+        ("bins", data_version(con), filters, zoom), query
+    )
+
+
+@lazy
+def get_connection() -> duckdb.DuckDBPyConnection:
+    """Shared connection to the requests database, built or attached on first use."""
+    return init_duckdb(config.DATA_PATH)
+
+
+@lazy
+def get_tile_pyramid() -> TilePyramid | None:
+    """Offline tile pyramid, when one built from this database exists."""
+    with open_cursor(get_connection()) as cursor:
+        return TilePyramid.open(config.TILE_PYRAMID_PATH, cursor)
+
+
+def data_version(con: duckdb.DuckDBPyConnection) -> str:
+    """Source fingerprint of the database a connection or cursor serves.
+
+    Cached results are keyed on it, so a cursor still on the database a reload
+    replaced never shares results with cursors on the new one.
+    """
+    row = con.sql("SELECT source_fingerprint FROM build_info").fetchone()
+    return str(row[0]) if row else ""
+
+
+@lazy
+def get_data_version() -> str:
+    """Source fingerprint of the database the shared connection serves."""
+    with open_cursor(get_connection()) as cursor:
+        return data_version(cursor)
+
+
+# Called after a reload swapped in a new database, to drop derived state
+_reload_callbacks: list[Callable[[], None]] = []
+_reload_lock = threading.Lock()
+
+
+def on_reload(callback: Callable[[], None]) -> None:
+    """Register a callback run after a reload swapped in a new database."""
+    _reload_callbacks.append(callback)
+
+
+def remove_reload_callback(callback: Callable[[], None]) -> None:
+    """Unregister a callback added with :func:`on_reload`, if it still is."""
+    with suppress(ValueError):
+        _reload_callbacks.remove(callback)
+
+
+def reload_database(
+    file_path: Path = config.DATA_PATH, database_path: Path = config.DATABASE_PATH
+) -> bool:
+    """Rebuild the database from changed parquet files and swap it in.
+
+    The first worker process to notice the change builds the new file, which
+    :func:`build_database` moves into place atomically; the others wait on a
+    file lock and then attach it. The new connection replaces the shared one,
+    so sessions run their next query on it while queries already running
+    finish on the previous database. Cached results, the tile pyramid and the
+    callbacks registered with :func:`on_reload` are invalidated.
+
+    Args:
+        file_path: Path to the parquet files
+        database_path: Path to the persisted DuckDB database file
 
     Returns:
-        List of subject names plus "All" option
+        Whether a new database was swapped in
     """
-    time_filter = SQLUtils.build_time_filter(start_date, end_date)
-    query = SQLUtils.build_distinct_column_query("subject", time_filter)
+    with _reload_lock:
+        fingerprint = compute_source_fingerprint(file_path)
+        if fingerprint == get_data_version():
+            return False
+
+        start = time.perf_counter()
+        with _build_lock(database_path):
+            if read_build_info(database_path) != (config.SCHEMA_VERSION, fingerprint):
+                build_database(file_path, database_path, fingerprint)
+
+        get_connection.set(connect_database(database_path))
+        get_data_version.reset()
+        get_tile_pyramid.reset()
+        result_cache.invalidate()
+        for callback in list(_reload_callbacks):
+            callback()
+
+        elapsed = time.perf_counter() - start
+        log.info(f"Reloaded {database_path} in {elapsed:.2f} s")
+        return True
+
+
+def watch_data(interval: float) -> threading.Thread:
+    """Poll the parquet files in a background thread and reload when they change.
+
+    Args:
+        interval: Seconds between checks of the file fingerprint
+
+    Returns:
+        The started daemon thread
+    """
+
+    def run() -> None:
+        while True:
+            time.sleep(interval)
+            try:
+                reload_database()
+            except Exception:
+                log.exception("Reloading the database failed")
 
-    df = con.sql(query).fetchdf()
-    if df is None or df.empty:
-        return ["All"]
-    return df["subject"].tolist() + ["All"]
+    thread = threading.Thread(target=run, name="data-watcher", daemon=True)
+    thread.start()
+    log.info(f"Watching {config.DATA_PATH} for changes every {interval:g} s")
+    return thread
 
 
-# Initialize database connection
-con = init_duckdb(config.DATA_PATH)
+# Bounded pool running session queries off the server's event loop; threads
+# are only started once queries are submitted
+query_executor = ThreadPoolExecutor(
+    max_workers=config.QUERY_THREADS, thread_name_prefix="query"
+)
@@ -8,6 +8,8 @@ import re
 import duckdb
 import requests
 
+from boston311.config import config
+
 log = logging.getLogger(__name__)
 BASE_URL = "https://data.boston.gov"
 
@@ -43,7 +45,8 @@ def save_out_to_parquet(url: str, output_path: str):
     service_requests_raw = con.read_csv(url)  # noqa: F841
 
     log.info("Processing spatial data and converting to Parquet...")
-    sql = """
+    order_by = ", ".join(config.SORT_COLUMNS)
+    sql = f"""
         SELECT 
             *,
             CASE 
@@ -53,8 +56,12 @@ def save_out_to_parquet(url: str, output_path: str):
             END as geometry
         FROM service_requests_raw
         WHERE geom_4326 IS NOT NULL 
+        ORDER BY {order_by}
         """
-    con.sql(f"COPY ({sql}) TO '{output_path}' (FORMAT 'parquet')")
+    con.sql(
+        f"COPY ({sql}) TO '{output_path}' "
+        f"(FORMAT 'parquet', ROW_GROUP_SIZE {config.ROW_GROUP_SIZE})"
+    )
     log.info(f"Saved to: {output_path}")
 
 
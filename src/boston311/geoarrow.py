@@ -0,0 +1,90 @@
+"""GeoArrow helpers for passing DuckDB results to lonboard."""
+
+import json
+import math
+from functools import cache
+
+import numpy as np
+import pyarrow as pa
+import pyproj
+
+# Ground distance of one degree of latitude, in meters
+METERS_PER_DEGREE = 111_320.0
+
+
+@cache
+def point_field_metadata() -> dict[bytes, bytes]:
+    """GeoArrow field metadata marking a coordinate list column as EPSG:4326 points."""
+    crs = pyproj.CRS.from_user_input("EPSG:4326").to_json_dict()
+    return {
+        b"ARROW:extension:name": b"geoarrow.point",
+        b"ARROW:extension:metadata": json.dumps({"crs": crs}).encode(),
+    }
+
+
+def _grid_steps(precision_meters: float, reference_latitude: float) -> np.ndarray:
+    """Grid size in degrees of (longitude, latitude) for a size in meters."""
+    step = precision_meters / METERS_PER_DEGREE
+    return np.array([step / math.cos(math.radians(reference_latitude)), step])
+
+
+def _fits_float32(steps: np.ndarray) -> bool:
+    """Whether float32 rounding anywhere on the globe stays within half a step.
+
+    The check doesn't depend on the data, so every table built with the same
+    grid has the same coordinate type and tables can be concatenated.
+    """
+    largest = np.array([180.0, 90.0], dtype=np.float32)
+    return bool(np.all(np.spacing(largest).astype(np.float64) / 2 <= steps / 2))
+
+
+def _interleave(
+    lon: pa.Array, lat: pa.Array, steps: np.ndarray | None, dtype: type
+) -> pa.FixedSizeListArray:
+    coords = np.empty((len(lon), 2), dtype=np.float64)
+    coords[:, 0] = lon.to_numpy(zero_copy_only=False)
+    coords[:, 1] = lat.to_numpy(zero_copy_only=False)
+    if steps is not None:
+        coords = np.round(coords / steps) * steps
+    return pa.FixedSizeListArray.from_arrays(pa.array(coords.astype(dtype).ravel()), 2)
+
+
+def lonlat_to_points(
+    table: pa.Table,
+    precision_meters: float | None = None,
+    reference_latitude: float = 0.0,
+) -> pa.Table:
+    """Replace the ``lon``/``lat`` columns with a GeoArrow point ``geometry`` column.
+
+    Coordinates are interleaved chunk by chunk into ``[x, y]`` lists, the
+    layout lonboard renders natively, so building a layer needs no WKB parsing
+    or reordering.
+
+    With ``precision_meters``, coordinates are snapped to a grid of that size.
+    Snapped values repeat across nearby points, so the Parquet payload lonboard
+    sends dictionary-encodes them; they are also narrowed to float32 when its
+    rounding error fits within the grid.
+
+    Args:
+        table: Arrow table with ``lon`` and ``lat`` columns
+        precision_meters: Optional grid size the coordinates are snapped to
+        reference_latitude: Latitude at which the grid size is converted to
+            degrees of longitude
+
+    Returns:
+        Arrow table with the coordinates in a trailing ``geometry`` column
+    """
+    steps = None
+    dtype: type = np.float64
+    if precision_meters is not None:
+        steps = _grid_steps(precision_meters, reference_latitude)
+        if _fits_float32(steps):
+            dtype = np.float32
+
+    chunks = [
+        _interleave(batch.column("lon"), batch.column("lat"), steps, dtype)
+        for batch in table.select(["lon", "lat"]).to_batches()
+    ]
+    geometry = pa.chunked_array(chunks, type=pa.list_(pa.from_numpy_dtype(dtype), 2))
+    field = pa.field("geometry", geometry.type, metadata=point_field_metadata())
+    return table.drop_columns(["lon", "lat"]).append_column(field, geometry)
@@ -0,0 +1,53 @@
+"""Thread-safe lazily initialized singletons."""
+
+import threading
+from collections.abc import Callable
+from functools import update_wrapper
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class Lazy(Generic[T]):
+    """A value built by a factory on first call and shared by every thread after.
+
+    Concurrent first calls wait for a single factory call; :meth:`reset` drops
+    the value so the next call builds it again, and :meth:`set` replaces it.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._lock = threading.Lock()
+        # (initialized, value), replaced as a whole so readers need no lock
+        self._state: tuple[bool, T | None] = (False, None)
+        update_wrapper(self, factory)
+
+    def __call__(self) -> T:
+        initialized, value = self._state
+        if not initialized:
+            with self._lock:
+                initialized, value = self._state
+                if not initialized:
+                    value = self._factory()
+                    self._state = (True, value)
+        return value  # type: ignore[return-value]
+
+    @property
+    def initialized(self) -> bool:
+        """Whether the value has been built."""
+        return self._state[0]
+
+    def set(self, value: T) -> None:
+        """Replace the value, e.g. to swap in a reloaded resource."""
+        with self._lock:
+            self._state = (True, value)
+
+    def reset(self) -> None:
+        """Drop the value so the next call builds it again."""
+        with self._lock:
+            self._state = (False, None)
+
+
+def lazy(factory: Callable[[], T]) -> Lazy[T]:
+    """Turn a zero-argument factory into a :class:`Lazy` singleton."""
+    return Lazy(factory)
@@ -0,0 +1,119 @@
+"""Shared result cache for materialized dashboard datasets."""
+
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, TypeVar
+
+import numpy as np
+import pyarrow as pa
+
+from boston311.config import config
+from boston311.logging_utils import get_logger
+
+log = get_logger(name="result_cache")
+
+T = TypeVar("T")
+
+# Set by start.py to each server worker's share of RESULT_CACHE_MAX_BYTES
+MAX_BYTES_ENV = "BOSTON311_RESULT_CACHE_MAX_BYTES"
+
+
+def estimate_nbytes(value: Any) -> int:
+    """Estimate the memory held by a cached value.
+
+    Arrow and NumPy buffers are counted exactly; containers are summed
+    recursively and anything else is counted as a small fixed overhead.
+    """
+    if isinstance(value, (pa.Table, pa.RecordBatch, pa.Array, pa.ChunkedArray)):
+        return value.nbytes
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(k) + estimate_nbytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_nbytes(item) for item in value)
+    return 64
+
+
+class ResultCache:
+    """Thread-safe LRU cache bounded by entry count and total size in bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        # Bumped by invalidate(), so results computed before it aren't stored
+        self._version = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        """Total estimated size of the cached values."""
+        return self._nbytes
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the cached value for ``key`` or None, marking it recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, version: int | None = None) -> None:
+        """Cache ``value`` under ``key``, evicting least recently used entries.
+
+        With ``version``, the value is dropped if the cache was invalidated
+        since that version was read.
+        """
+        nbytes = estimate_nbytes(value)
+        if nbytes > self.max_bytes:
+            log.info(f"Not caching {key!r}: {nbytes:,} bytes exceeds the cache size")
+            return
+
+        with self._lock:
+            if version is not None and version != self._version:
+                return
+            if key in self._entries:
+                self._nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self._nbytes += nbytes
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._nbytes > self.max_bytes
+            ):
+                _, (_, evicted_nbytes) = self._entries.popitem(last=False)
+                self._nbytes -= evicted_nbytes
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], T]) -> T:
+        """Return the cached value for ``key``, computing and caching it on a miss."""
+        version = self._version
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        value = compute()
+        self.put(key, value, version)
+        return value
+
+    def invalidate(self) -> None:
+        """Drop every cached value, including results still being computed."""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self._nbytes = 0
+
+
+# Process-wide cache shared by every dashboard session
+result_cache = ResultCache(
+    max_entries=config.RESULT_CACHE_MAX_ENTRIES,
+    max_bytes=int(os.environ.get(MAX_BYTES_ENV) or config.RESULT_CACHE_MAX_BYTES),
+)
@@ -1,7 +1,37 @@
 """SQL utilities for safe query construction."""
 
+from datetime import datetime, time
+from functools import cache
+from typing import Any, NamedTuple
+
 from boston311.config import config
 
+# Columns that can be filtered on, in the order their parameters are bound
+FILTER_COLUMNS: tuple[str, ...] = ("neighborhood", "source", "subject")
+
+# Measures stored in the per-day aggregate cube
+AGGREGATE_MEASURES: dict[str, str] = {
+    "count": "BIGINT",
+    "open_count": "BIGINT",
+    "closed_count": "BIGINT",
+    "response_hours_sum": "DOUBLE",
+}
+
+# Columns loaded for the map layer; lon/lat become a GeoArrow point column
+POINT_COLUMNS = "row_id, source, subject, neighborhood, open_dt, lon, lat"
+
+# Columns returned for the table view; the wide ingest exposes every loaded column
+SELECTION_COLUMNS = (
+    "* EXCLUDE (row_id)"
+    if config.INGEST_WIDE
+    else "source, subject, neighborhood, open_dt, geometry"
+)
+
+
+def is_day_aligned(timestamp: str) -> bool:
+    """Check whether a timestamp string falls exactly on a day boundary."""
+    return datetime.fromisoformat(timestamp).time() == time()
+
 
 class SQLUtils:
     """Utilities for safe SQL query construction."""
@@ -15,21 +45,260 @@ class SQLUtils:
             )
         return column
 
+
+class FilterState(NamedTuple):
+    """Normalized filter selection; unfiltered ("All") columns are stored as None."""
+
+    start_date: str
+    end_date: str
+    neighborhood: str | None = None
+    source: str | None = None
+    subject: str | None = None
+
+    @classmethod
+    def from_selection(
+        cls,
+        time_range: tuple[str, str],
+        neighborhood: Any = "All",
+        source: Any = "All",
+        subject: Any = "All",
+    ) -> "FilterState":
+        """Build a filter state from selector values, mapping "All" to None."""
+
+        def normalize(value: Any) -> str | None:
+            return value if isinstance(value, str) and value != "All" else None
+
+        return cls(
+            *time_range,
+            neighborhood=normalize(neighborhood),
+            source=normalize(source),
+            subject=normalize(subject),
+        )
+
+    @property
+    def active_columns(self) -> tuple[str, ...]:
+        """Columns with an active equality filter."""
+        return tuple(
+            column for column in FILTER_COLUMNS if getattr(self, column) is not None
+        )
+
+    @property
+    def params(self) -> list[Any]:
+        """Bound values for the WHERE clause built by :class:`QueryBuilder`."""
+        return [
+            self.start_date,
+            self.end_date,
+            *(getattr(self, column) for column in self.active_columns),
+        ]
+
+
+class QueryBuilder:
+    """Builds the fixed set of parameterized dashboard statements.
+
+    Statement texts only depend on which filters are active, so each one is
+    built once and reused with ``?`` placeholders bound at execution time.
+    """
+
+    @staticmethod
+    @cache
+    def _where_clause(active_columns: tuple[str, ...]) -> str:
+        conditions = ["geometry IS NOT NULL", "open_dt >= ?", "open_dt < ?"]
+        conditions.extend(f"{column} = ?" for column in active_columns)
+        return " AND ".join(conditions)
+
+    @staticmethod
+    @cache
+    def _points_query(active_columns: tuple[str, ...]) -> str:
+        # row_id follows open_dt, so it doubles as a deterministic sort key
+        return f"""
+            SELECT {POINT_COLUMNS}
+            FROM requests
+            WHERE {QueryBuilder._where_clause(active_columns)}
+            ORDER BY row_id DESC
+        """
+
+    @staticmethod
+    @cache
+    def _bbox_query(active_columns: tuple[str, ...], columns: str) -> str:
+        # ST_Intersects lets the R-tree index serve the query; without it the
+        # precomputed lon/lat columns avoid decoding the geometry
+        if config.SPATIAL_INDEX:
+            bbox_filter = "ST_Intersects(geometry, ST_MakeEnvelope(?, ?, ?, ?))"
+        else:
+            bbox_filter = "lon BETWEEN ? AND ? AND lat BETWEEN ? AND ?"
+
+        return f"""
+            SELECT {columns}
+            FROM requests
+            WHERE {QueryBuilder._where_clause(active_columns)} AND {bbox_filter}
+            ORDER BY row_id DESC
+            LIMIT ?
+        """
+
+    @staticmethod
+    def _bbox_params(bounds: tuple[float, float, float, float]) -> list[float]:
+        minx, miny, maxx, maxy = (float(value) for value in bounds)
+        if config.SPATIAL_INDEX:
+            return [minx, miny, maxx, maxy]
+        return [minx, maxx, miny, maxy]
+
+    @staticmethod
+    @cache
+    def _bins_query(active_columns: tuple[str, ...]) -> str:
+        # Hexagon centers form two offset rectangular grids of w x h degrees;
+        # each point goes to the nearer center, measured in hexagon units where
+        # a row step is sqrt(3) times a column step
+        return f"""
+            WITH grid AS (SELECT ?::DOUBLE AS w, ?::DOUBLE AS h),
+            scaled AS (
+                SELECT lon / w AS gx, lat / h AS gy
+                FROM requests, grid
+                WHERE {QueryBuilder._where_clause(active_columns)}
+            ),
+            nearest AS (
+                SELECT
+                    (gx - round(gx)) ** 2 + 3 * (gy - round(gy)) ** 2
+                        <= (gx - floor(gx) - 0.5) ** 2
+                            + 3 * (gy - floor(gy) - 0.5) ** 2 AS on_grid,
+                    CASE WHEN on_grid THEN round(gx) ELSE floor(gx) + 0.5 END AS cx,
+                    CASE WHEN on_grid THEN round(gy) ELSE floor(gy) + 0.5 END AS cy
+                FROM scaled
+            )
+            SELECT cx * w AS lon, cy * h AS lat, count(*)::BIGINT AS count
+            FROM nearest, grid
+            GROUP BY cx, cy, w, h
+            ORDER BY count
+        """
+
+    @staticmethod
+    @cache
+    def _dimension_query(time_filtered: bool, from_cube: bool) -> str:
+        columns = [SQLUtils.validate_column_name(column) for column in FILTER_COLUMNS]
+        dimension = " ".join(
+            f"WHEN GROUPING({column}) = 0 THEN '{column}'" for column in columns
+        )
+        value = ", ".join(f"{column}::VARCHAR" for column in columns)
+        grouping_sets = ", ".join(f"({column})" for column in columns)
+
+        # The daily cube answers day-aligned ranges exactly from far fewer rows
+        if from_cube:
+            table, count, time_column = "daily_counts", "sum(count)::BIGINT", "day"
+        else:
+            table, count, time_column = "requests", "count(*)", "open_dt"
+        time_filter = (
+            f"WHERE {time_column} >= ?::TIMESTAMP AND {time_column} < ?::TIMESTAMP"
+            if time_filtered
+            else ""
+        )
+        return f"""
+            SELECT
+                CASE {dimension} END AS dimension,
+                coalesce({value}) AS value,
+                {count} AS count
+            FROM {table}
+            {time_filter}
+            GROUP BY GROUPING SETS ({grouping_sets})
+            HAVING coalesce({value}) IS NOT NULL
+            ORDER BY dimension, value
+        """
+
+    @staticmethod
+    @cache
+    def _aggregate_query(
+        active_columns: tuple[str, ...], group_by: tuple[str, ...]
+    ) -> str:
+        keys = ", ".join(
+            column if column == "day" else SQLUtils.validate_column_name(column)
+            for column in group_by
+        )
+        conditions = ["day >= ?::TIMESTAMP", "day < ?::TIMESTAMP"]
+        conditions.extend(f"{column} = ?" for column in active_columns)
+        measures = ", ".join(
+            f"sum({measure})::{type_} AS {measure}"
+            for measure, type_ in AGGREGATE_MEASURES.items()
+        )
+        select = f"{keys}, {measures}" if keys else measures
+        group = f"GROUP BY {keys} ORDER BY {keys}" if keys else ""
+        return f"""
+            SELECT {select}
+            FROM daily_counts
+            WHERE {" AND ".join(conditions)}
+            {group}
+        """
+
     @staticmethod
-    def escape_sql_string(value: str) -> str:
-        """Safely escape SQL string values."""
-        return value.replace("'", "''")
+    def points(filters: FilterState) -> tuple[str, list[Any]]:
+        """Query for the map points matching the filters."""
+        return QueryBuilder._points_query(filters.active_columns), filters.params
 
     @staticmethod
-    def build_time_filter(start_date: str | None, end_date: str | None) -> str:
-        """Build safe time filter clause."""
+    def bbox_selection(
+        filters: FilterState,
+        bounds: tuple[float, float, float, float],
+        limit: int = config.MAX_SELECTION_RECORDS,
+    ) -> tuple[str, list[Any]]:
+        """Query for the rows matching the filters inside a bounding box."""
+        query = QueryBuilder._bbox_query(filters.active_columns, SELECTION_COLUMNS)
+        bbox_params = QueryBuilder._bbox_params(bounds)
+        return query, [*filters.params, *bbox_params, int(limit)]
+
+    @staticmethod
+    def bbox_points(
+        filters: FilterState,
+        bounds: tuple[float, float, float, float],
+        limit: int,
+    ) -> tuple[str, list[Any]]:
+        """Query for the newest map points matching the filters inside a box."""
+        query = QueryBuilder._bbox_query(filters.active_columns, POINT_COLUMNS)
+        bbox_params = QueryBuilder._bbox_params(bounds)
+        return query, [*filters.params, *bbox_params, int(limit)]
+
+    @staticmethod
+    def bins(
+        filters: FilterState, cell_width: float, cell_height: float
+    ) -> tuple[str, list[Any]]:
+        """Query for hexagon bin centers and counts of the matching rows.
+
+        Centers sit on a grid ``cell_width`` degrees of longitude apart, with
+        rows ``cell_height / 2`` degrees of latitude apart; for regular hexagons
+        ``cell_height`` is ``sqrt(3)`` times the width in ground distance.
+        """
+        query = QueryBuilder._bins_query(filters.active_columns)
+        return query, [float(cell_width), float(cell_height), *filters.params]
+
+    @staticmethod
+    def row_by_id(row_id: int) -> tuple[str, list[Any]]:
+        """Query for a single row by its row id."""
+        return (
+            f"SELECT {SELECTION_COLUMNS} FROM requests WHERE row_id = ?",
+            [int(row_id)],
+        )
+
+    @staticmethod
+    def dimension_counts(
+        start_date: str | None = None, end_date: str | None = None
+    ) -> tuple[str, list[Any]]:
+        """Query for the values and row counts of every filter column in one scan.
+
+        Day-aligned ranges are answered from the ``daily_counts`` cube. Returns
+        rows of (dimension, value, count), where dimension is one of
+        ``FILTER_COLUMNS``.
+        """
         if not start_date or not end_date:
-            return ""
+            return QueryBuilder._dimension_query(False, True), []
 
-        return f" AND open_dt >= '{SQLUtils.escape_sql_string(start_date)}' AND open_dt < '{SQLUtils.escape_sql_string(end_date)}'"
+        from_cube = is_day_aligned(start_date) and is_day_aligned(end_date)
+        query = QueryBuilder._dimension_query(True, from_cube)
+        return query, [start_date, end_date]
 
     @staticmethod
-    def build_distinct_column_query(column: str, time_filter: str = "") -> str:
-        """Build a safe query to get distinct values from a column."""
-        validated_column = SQLUtils.validate_column_name(column)
-        return f"SELECT DISTINCT {validated_column} FROM requests WHERE {validated_column} IS NOT NULL{time_filter} ORDER BY {validated_column}"
+    def aggregate(
+        filters: FilterState, group_by: tuple[str, ...] = ()
+    ) -> tuple[str, list[Any]]:
+        """Query the ``daily_counts`` cube for the measures matching the filters.
+
+        Days are included when their start falls inside the filter's time range.
+        ``group_by`` may contain "day" and any of ``FILTER_COLUMNS``.
+        """
+        query = QueryBuilder._aggregate_query(filters.active_columns, tuple(group_by))
+        return query, filters.params
@@ -0,0 +1,255 @@
+"""
+Offline tile pyramid of the Boston 311 requests.
+
+Points are written once per year and zoom level as Arrow IPC files laid out as
+``{year}/{z}/{x}/{y}.arrow`` under ``TILE_PYRAMID_PATH``, each holding the
+tile's points newest first with their ``lon``/``lat`` coordinates. The
+dashboard memory maps these files instead of querying DuckDB when streaming
+viewport tiles, and ``start.py`` serves the directory under ``/TILE_ROUTE/``.
+
+Usage:
+    uv run python -m boston311.tile_pyramid
+"""
+
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from boston311.config import config
+from boston311.sql_utils import FILTER_COLUMNS, POINT_COLUMNS, FilterState
+from boston311.tiles import MAX_LATITUDE, Tile
+
+log = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+SCHEMA_NAME = "schema.arrow"
+TILE_SUFFIX = ".arrow"
+# Bumped when the tile layout or schema changes
+PYRAMID_VERSION = 3
+
+
+def _read_build_info(con: duckdb.DuckDBPyConnection) -> tuple[int, str]:
+    row = con.sql(
+        "SELECT schema_version, source_fingerprint FROM build_info"
+    ).fetchone()
+    if row is None:
+        raise ValueError("Database has no build info")
+    return int(row[0]), str(row[1])
+
+
+def _tile_query(zoom: int) -> str:
+    tiles = 2**zoom
+    lat = f"radians(greatest(-{MAX_LATITUDE}, least({MAX_LATITUDE}, lat)))"
+    return f"""
+        SELECT
+            least({tiles - 1}, floor((lon + 180) / 360 * {tiles}))::INTEGER AS tile_x,
+            floor((1 - asinh(tan({lat})) / pi()) / 2 * {tiles})::INTEGER AS tile_y,
+            {POINT_COLUMNS}
+        FROM requests
+        WHERE geometry IS NOT NULL
+            AND open_dt >= ?::TIMESTAMP AND open_dt < ?::TIMESTAMP
+        ORDER BY tile_x, tile_y, row_id DESC
+    """
+
+
+def _write_table(path: Path, table: pa.Table) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with pa.ipc.new_file(path, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _write_tiles(directory: Path, table: pa.Table) -> int:
+    """Split a table sorted by tile into one file per tile.
+
+    Returns:
+        Number of tiles written
+    """
+    xs = table.column("tile_x").to_numpy()
+    ys = table.column("tile_y").to_numpy()
+    points = table.drop_columns(["tile_x", "tile_y"])
+
+    # Tiles are contiguous runs of equal (x, y)
+    breaks = np.flatnonzero((np.diff(xs) != 0) | (np.diff(ys) != 0)) + 1
+    starts = np.concatenate([[0], breaks]) if len(xs) else breaks
+    ends = np.append(starts[1:], len(xs))
+    for start, end in zip(starts, ends):
+        path = directory / str(xs[start]) / f"{ys[start]}{TILE_SUFFIX}"
+        _write_table(path, points.slice(start, end - start))
+    return len(starts)
+
+
+def build_tile_pyramid(
+    con: duckdb.DuckDBPyConnection,
+    output_dir: Path = config.TILE_PYRAMID_PATH,
+    zooms: tuple[int, ...] = config.TILE_PYRAMID_ZOOMS,
+) -> None:
+    """Write the tile pyramid for every year and zoom level.
+
+    The pyramid is written to a temporary directory and swapped into place, and
+    its manifest records the database build it was made from.
+
+    Args:
+        con: DuckDB connection with the requests database selected
+        output_dir: Directory the pyramid is written to
+        zooms: Zoom levels to write
+    """
+    schema_version, fingerprint = _read_build_info(con)
+    years = [
+        int(row[0])
+        for row in con.sql(
+            "SELECT DISTINCT year(open_dt) FROM requests "
+            "WHERE geometry IS NOT NULL AND open_dt IS NOT NULL ORDER BY 1"
+        ).fetchall()
+    ]
+
+    tmp_dir = output_dir.with_name(f"{output_dir.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    try:
+        # An empty table with the tile schema, for tiles without points
+        empty = con.sql(
+            f"{_tile_query(0)} LIMIT 0", params=["1970-01-01", "1970-01-01"]
+        ).arrow()
+        _write_table(
+            tmp_dir / SCHEMA_NAME,
+            empty.drop_columns(["tile_x", "tile_y"]),
+        )
+
+        for zoom in zooms:
+            query = _tile_query(zoom)
+            for year in years:
+                params = [f"{year}-01-01", f"{year + 1}-01-01"]
+                table = con.sql(query, params=params).arrow()
+                count = _write_tiles(tmp_dir / str(year) / str(zoom), table)
+                log.info(f"Wrote {count:,} tiles for {year} at zoom {zoom}")
+
+        manifest = {
+            "pyramid_version": PYRAMID_VERSION,
+            "schema_version": schema_version,
+            "source_fingerprint": fingerprint,
+            "zooms": list(zooms),
+            "years": years,
+            "built_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        (tmp_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    # Swap the new pyramid in, then drop the previous one
+    old_dir = output_dir.with_name(f"{output_dir.name}.{os.getpid()}.old")
+    if output_dir.exists():
+        os.replace(output_dir, old_dir)
+    os.replace(tmp_dir, output_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    log.info(f"Tile pyramid written to {output_dir}")
+
+
+class TilePyramid:
+    """Reads point tiles from a pyramid written by :func:`build_tile_pyramid`."""
+
+    def __init__(self, path: Path, zooms: tuple[int, ...], years: tuple[int, ...]):
+        self.path = path
+        self.zooms = zooms
+        self.years = years
+        self.schema = pa.ipc.open_file(path / SCHEMA_NAME).schema
+
+    @classmethod
+    def open(cls, path: Path, con: duckdb.DuckDBPyConnection) -> "TilePyramid | None":
+        """Open the pyramid at ``path`` if it was built from the connected database.
+
+        Returns:
+            The pyramid, or None if it is missing or stale
+        """
+        try:
+            manifest = json.loads((path / MANIFEST_NAME).read_text())
+        except FileNotFoundError:
+            return None
+
+        build_info = (manifest["schema_version"], manifest["source_fingerprint"])
+        if manifest.get(
+            "pyramid_version"
+        ) != PYRAMID_VERSION or build_info != _read_build_info(con):
+            log.warning(f"Ignoring stale tile pyramid at {path}")
+            return None
+
+        log.info(f"Serving viewport tiles from {path}")
+        return cls(path, tuple(manifest["zooms"]), tuple(manifest["years"]))
+
+    def cover(self, tiles: tuple[Tile, ...]) -> tuple[Tile, ...]:
+        """Replace tiles finer than the pyramid with their distinct ancestors."""
+        top = max(self.zooms)
+        covered: dict[Tile, None] = {}
+        for tile in tiles:
+            shift = tile.z - top
+            if shift > 0:
+                tile = Tile(top, tile.x >> shift, tile.y >> shift)
+            covered[tile] = None
+        return tuple(covered)
+
+    def serves(self, tile: Tile) -> bool:
+        """Whether the pyramid has a level for the tile's zoom."""
+        return tile.z in self.zooms
+
+    def read(self, filters: FilterState, tile: Tile, limit: int) -> pa.Table:
+        """Read the newest points of a tile matching the filters.
+
+        Args:
+            filters: Normalized filter selection
+            tile: Tile at one of the pyramid's zoom levels
+            limit: Maximum number of rows returned
+
+        Returns:
+            Arrow table of the matching points, newest first
+        """
+        start = datetime.fromisoformat(filters.start_date)
+        end = datetime.fromisoformat(filters.end_date)
+
+        # Newer years first keeps the concatenated rows ordered by row id
+        tables = []
+        for year in sorted(self.years, reverse=True):
+            if not (datetime(year, 1, 1) < end and start < datetime(year + 1, 1, 1)):
+                continue
+            path = self.path / str(year) / str(tile.z) / str(tile.x)
+            path = path / f"{tile.y}{TILE_SUFFIX}"
+            if path.exists():
+                table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+                if table.num_rows:
+                    tables.append(table)
+        if not tables:
+            return self.schema.empty_table()
+
+        table = pa.concat_tables(tables)
+        open_dt = table.column("open_dt")
+        mask = pc.and_(pc.greater_equal(open_dt, start), pc.less(open_dt, end))
+        for column in FILTER_COLUMNS:
+            value = getattr(filters, column)
+            if value is not None:
+                mask = pc.and_(mask, pc.equal(table.column(column), value))
+
+        # Filtering leaves a (possibly empty) chunk per input chunk
+        return table.filter(mask).slice(0, limit).combine_chunks()
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+
+    # Getting the connection builds or attaches the requests database
+    from boston311.database import get_connection
+
+    log.info("Building tile pyramid...")
+    build_tile_pyramid(get_connection())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Web Mercator tile utilities for the Boston 311 dashboard."""
+
+import math
+from typing import NamedTuple
+
+# Web Mercator tile edge in pixels
+TILE_SIZE = 256
+
+# Latitude limit of the Web Mercator projection
+MAX_LATITUDE = 85.05112878
+
+
+class Tile(NamedTuple):
+    """A slippy map tile address."""
+
+    z: int
+    x: int
+    y: int
+
+    @property
+    def bounds(self) -> tuple[float, float, float, float]:
+        """Tile extent as (min lon, min lat, max lon, max lat)."""
+        minx, maxy = pixel_to_lonlat(self.x * TILE_SIZE, self.y * TILE_SIZE, self.z)
+        maxx, miny = pixel_to_lonlat(
+            (self.x + 1) * TILE_SIZE, (self.y + 1) * TILE_SIZE, self.z
+        )
+        return minx, miny, maxx, maxy
+
+
+def lonlat_to_pixel(lon: float, lat: float, zoom: float) -> tuple[float, float]:
+    """Project a coordinate to world pixel coordinates at a zoom level."""
+    world = TILE_SIZE * 2**zoom
+    lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+    x = (lon + 180) / 360 * world
+    y = (1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * world
+    return x, y
+
+
+def pixel_to_lonlat(x: float, y: float, zoom: float) -> tuple[float, float]:
+    """Unproject world pixel coordinates at a zoom level to a coordinate."""
+    world = TILE_SIZE * 2**zoom
+    lon = x / world * 360 - 180
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / world))))
+    return lon, lat
+
+
+def viewport_tiles(
+    longitude: float,
+    latitude: float,
+    zoom: float,
+    width: int,
+    height: int,
+    tile_zoom: int,
+    margin: float = 0.0,
+) -> tuple[Tile, ...]:
+    """List the tiles at ``tile_zoom`` covering a viewport.
+
+    Args:
+        longitude: Viewport center longitude
+        latitude: Viewport center latitude
+        zoom: Viewport zoom level
+        width: Viewport width in pixels
+        height: Viewport height in pixels
+        tile_zoom: Zoom level of the returned tiles
+        margin: Fraction of the viewport size added on every side
+
+    Returns:
+        Tiles in row-major order
+    """
+    cx, cy = lonlat_to_pixel(longitude, latitude, zoom)
+    half_width = width * (0.5 + margin)
+    half_height = height * (0.5 + margin)
+
+    # Convert the viewport corners from viewport zoom to tile zoom pixels
+    scale = 2 ** (tile_zoom - zoom) / TILE_SIZE
+    last = 2**tile_zoom - 1
+    minx = max(0, math.floor((cx - half_width) * scale))
+    maxx = min(last, math.floor((cx + half_width) * scale))
+    miny = max(0, math.floor((cy - half_height) * scale))
+    maxy = min(last, math.floor((cy + half_height) * scale))
+
+    return tuple(
+        Tile(tile_zoom, x, y)
+        for y in range(miny, maxy + 1)
+        for x in range(minx, maxx + 1)
+    )
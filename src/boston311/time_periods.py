@@ -1,67 +1,99 @@
 """Time period utilities for the Boston 311 dashboard."""
 
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 from dateutil.relativedelta import relativedelta
 
 from boston311.config import config
 
+# Period selected when a session starts
+DEFAULT_TIME_PERIOD = "Year to Date"
 
-def get_time_periods() -> dict[str, tuple[str, str]]:
-    """Generate dynamic time period options based on current date.
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def period_end(now: datetime, resolution: str | None = None) -> datetime:
+    """Round a time up to the start of the next day or hour.
+
+    Relative periods end at this boundary, so their bounds - and every cache key
+    built from them - stay the same until the clock crosses it.
+
+    Args:
+        now: Current time
+        resolution: "day" or "hour", defaults to ``config.TIME_PERIOD_RESOLUTION``
+
+    Returns:
+        Start of the bucket following the one ``now`` falls in
+    """
+    resolution = resolution or config.TIME_PERIOD_RESOLUTION
+    if resolution == "hour":
+        return now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    if resolution == "day":
+        return datetime(now.year, now.month, now.day) + timedelta(days=1)
+    raise ValueError(f"Invalid time period resolution: {resolution}")
+
+
+def _year_range(year: int) -> tuple[str, str]:
+    return f"{year}-01-01 00:00:00", f"{year + 1}-01-01 00:00:00"
+
+
+def get_time_periods(now: datetime | None = None) -> dict[str, tuple[str, str]]:
+    """Generate time period options relative to the current bucket.
+
+    Args:
+        now: Time to resolve relative periods at, defaults to the current time
 
     Returns:
         Dictionary mapping display names to (start_date, end_date) tuples
     """
-    now = datetime.now()
-    current_year = now.year
+    end = period_end(now or datetime.now())
+    # The last moment covered decides the current year
+    current_year = (end - timedelta(microseconds=1)).year
     periods: dict[str, tuple[str, str]] = {}
 
     # Current and recent years (dynamic based on current date)
     min_year = max(config.MIN_YEAR, current_year - config.RECENT_YEARS_COUNT)
     for year in range(current_year, min_year, -1):
-        periods[str(year)] = (
-            f"{year}-01-01 00:00:00",
-            f"{year + 1}-01-01 00:00:00",
-        )
-
-    # Dynamic relative periods
-    # Last 30 days
-    thirty_days_ago = now - timedelta(days=30)
-    periods["Last 30 Days"] = (
-        thirty_days_ago.strftime("%Y-%m-%d %H:%M:%S"),
-        now.strftime("%Y-%m-%d %H:%M:%S"),
-    )
-
-    # Last 90 days
-    ninety_days_ago = now - timedelta(days=90)
-    periods["Last 90 Days"] = (
-        ninety_days_ago.strftime("%Y-%m-%d %H:%M:%S"),
-        now.strftime("%Y-%m-%d %H:%M:%S"),
-    )
-
-    # Last 6 months
-    six_months_ago = now - relativedelta(months=6)
-    periods["Last 6 Months"] = (
-        six_months_ago.strftime("%Y-%m-%d %H:%M:%S"),
-        now.strftime("%Y-%m-%d %H:%M:%S"),
-    )
-
-    # Year to date
-    year_start = datetime(current_year, 1, 1)
-    periods["Year to Date"] = (
-        year_start.strftime("%Y-%m-%d %H:%M:%S"),
-        now.strftime("%Y-%m-%d %H:%M:%S"),
-    )
-
-    # Complete dataset
-    periods["Complete Dataset (2011-Present)"] = (
-        f"{config.MIN_YEAR}-01-01 00:00:00",
-        now.strftime("%Y-%m-%d %H:%M:%S"),
-    )
+        periods[str(year)] = _year_range(year)
+
+    # Relative periods end at the bucket boundary
+    end_date = end.strftime(TIMESTAMP_FORMAT)
+    relative_starts = {
+        "Last 30 Days": end - timedelta(days=30),
+        "Last 90 Days": end - timedelta(days=90),
+        "Last 6 Months": end - relativedelta(months=6),
+        "Year to Date": datetime(current_year, 1, 1),
+        "Complete Dataset (2011-Present)": datetime(config.MIN_YEAR, 1, 1),
+    }
+    for name, start in relative_starts.items():
+        periods[name] = (start.strftime(TIMESTAMP_FORMAT), end_date)
 
     return periods
 
 
-# Generate time periods dynamically
-TIME_PERIODS = get_time_periods()
+@lru_cache(maxsize=2)
+def _time_periods_until(end: datetime) -> dict[str, tuple[str, str]]:
+    return get_time_periods(end - timedelta(microseconds=1))
+
+
+def current_time_periods() -> dict[str, tuple[str, str]]:
+    """Time periods for the current bucket, recomputed once the clock leaves it."""
+    return _time_periods_until(period_end(datetime.now()))
+
+
+def resolve_time_period(name: str) -> tuple[str, str]:
+    """Resolve a period name to its current (start_date, end_date).
+
+    A year that has since dropped out of the recent years, e.g. in a session
+    left open over New Year, still resolves to that year.
+
+    Raises:
+        KeyError: If the name is not a time period
+    """
+    periods = current_time_periods()
+    if name in periods:
+        return periods[name]
+    if name.isdigit():
+        return _year_range(int(name))
+    raise KeyError(name)
@@ -5,11 +5,28 @@ import panel as pn
 from boston311.config import config
 
 
+def create_selector_options(counts: dict[str, int]) -> dict[str, str]:
+    """Build selector options for a filter column.
+
+    Args:
+        counts: Dictionary mapping values to their row counts
+
+    Returns:
+        Dictionary mapping display labels to values, with the "All" option last
+    """
+    if config.SHOW_OPTION_COUNTS:
+        options = {f"{value} ({count:,})": value for value, count in counts.items()}
+    else:
+        options = {value: value for value in counts}
+    options["All"] = "All"
+    return options
+
+
 def create_table_view(selected_data, show_table: bool):
     """Create a table view for selected data.
 
     Args:
-        selected_data: DuckDB relation containing selected data
+        selected_data: DataFrame containing selected data
         show_table: Whether to show the table
 
     Returns:
@@ -22,7 +39,7 @@ def create_table_view(selected_data, show_table: bool):
             margin=10,
         )
 
-    df = selected_data.fetchdf()
+    df = selected_data
     if df.empty:
         return pn.pane.HTML(
             "<div style='text-align: center; color: #6c757d; font-style: italic; padding: 20px;'>No data found in selection</div>",
@@ -44,7 +61,7 @@ def create_table_view(selected_data, show_table: bool):
 
     # Format datetime columns
     for col in df_display.columns:
-        if df_display[col].dtype == "datetime64[ns]":
+        if df_display[col].dtype.kind == "M":
             df_display[col] = df_display[col].dt.strftime("%Y-%m-%d %H:%M:%S")
 
     # Determine title and limit rows if needed
@@ -0,0 +1,155 @@
+"""
+Warm up a server process before it serves its first sessions.
+
+``start.py --warmup`` passes this file to ``panel serve --setup``. With one
+process Panel runs it before the server starts. With several, each worker
+runs it on its event loop right after its server started (``start.py`` never
+passes ``--num-procs 0``, which would run it before forking); the worker
+already accepts connections then, but handles none until the warmup returns.
+The database connection, tile pyramid, color mappings, time periods and
+default selector options are then initialized once per process instead of in
+the first visitor's session.
+
+With ``config.WARMUP_PERIODS``, every predefined time period is then warmed
+into the result cache too: its selector options, its unfiltered hexagon bins
+at ``config.WARMUP_ZOOMS`` and their colors. This runs before serving, or in a
+background thread with ``config.WARMUP_BACKGROUND`` (``start.py
+--warmup-background``), so a period's first visit costs the same as a repeat.
+Rolling periods move to new bounds at every day or hour boundary, so a
+background thread warms them again each time that happens.
+
+With ``config.DATA_RELOAD_INTERVAL``, each worker also watches the parquet
+files and hot-reloads the database when they change, warming the periods again
+afterwards.
+
+Usage:
+    uv run python -m boston311.warmup
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+
+import duckdb
+
+from boston311.color_mapping import color_lookup_tables, dataset_colors
+from boston311.config import config
+from boston311.connections import get_connection_manager
+from boston311.database import (
+    data_version,
+    fetch_bins,
+    get_connection,
+    get_dimension_options,
+    get_tile_pyramid,
+    on_reload,
+    open_cursor,
+    watch_data,
+)
+from boston311.logging_utils import get_logger
+from boston311.sql_utils import FilterState
+from boston311.time_periods import (
+    DEFAULT_TIME_PERIOD,
+    current_time_periods,
+    period_end,
+)
+
+log = get_logger(name="warmup")
+
+# Set by start.py to warm the time periods in a background thread
+BACKGROUND_ENV = "BOSTON311_WARMUP_BACKGROUND"
+
+
+def warm_period(
+    cursor: duckdb.DuckDBPyConnection, time_range: tuple[str, str]
+) -> float:
+    """Load a time period's options, default bins and colors into the result cache.
+
+    Args:
+        cursor: DuckDB cursor
+        time_range: Period (start_date, end_date)
+
+    Returns:
+        Seconds spent, near zero when everything was already cached
+    """
+    start = time.perf_counter()
+    get_dimension_options(cursor, *time_range)
+
+    # Keys match the level of detail keys sessions load the same data under
+    version = data_version(cursor)
+    filters = FilterState.from_selection(time_range)
+    for zoom in config.WARMUP_ZOOMS:
+        bins = fetch_bins(cursor, filters, zoom)
+        dataset_colors(("bins", version, filters, zoom), bins, "count")
+    return time.perf_counter() - start
+
+
+def warm_periods() -> dict[str, float]:
+    """Warm every predefined time period, logging the time each one took.
+
+    Returns:
+        Seconds spent per period name
+    """
+    timings: dict[str, float] = {}
+    with open_cursor(get_connection()) as cursor:
+        for name, time_range in current_time_periods().items():
+            timings[name] = warm_period(cursor, time_range)
+            log.info(f"Warmed {name!r} in {timings[name]:.2f} s")
+
+    log.info(f"Warmed {len(timings)} time periods in {sum(timings.values()):.2f} s")
+    return timings
+
+
+def rewarm_on_rollover() -> threading.Thread:
+    """Warm the periods again whenever their day or hour bucket rolls over.
+
+    Returns:
+        The started daemon thread
+    """
+
+    def run() -> None:
+        while True:
+            now = datetime.now()
+            # A moment past the boundary, so the new bucket is the current one
+            time.sleep((period_end(now) - now).total_seconds() + 1)
+            try:
+                warm_periods()
+            except Exception:
+                log.exception("Warming the rolled over time periods failed")
+
+    thread = threading.Thread(target=run, name="rewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def warmup() -> None:
+    """Initialize the process-wide singletons the dashboard sessions share."""
+    start = time.perf_counter()
+    get_connection_manager()
+    get_tile_pyramid()
+    color_lookup_tables()
+
+    with open_cursor(get_connection()) as cursor:
+        get_dimension_options(cursor, *current_time_periods()[DEFAULT_TIME_PERIOD])
+
+    elapsed = time.perf_counter() - start
+    log.info(f"Warmed up process {os.getpid()} in {elapsed:.2f} s")
+
+    if config.DATA_RELOAD_INTERVAL is not None:
+        watch_data(config.DATA_RELOAD_INTERVAL)
+
+    if not config.WARMUP_PERIODS:
+        return
+    # A reload empties the result cache and a new bucket changes every relative
+    # period; refill the cache in both cases
+    on_reload(warm_periods)
+    rewarm_on_rollover()
+    if config.WARMUP_BACKGROUND or os.environ.get(BACKGROUND_ENV):
+        threading.Thread(target=warm_periods, name="warmup", daemon=True).start()
+    else:
+        warm_periods()
+
+
+# Panel executes setup scripts as a module named "panel_setup_module"
+if __name__ in ("__main__", "panel_setup_module"):
+    warmup()
@@ -1,12 +1,15 @@
 #!/usr/bin/env python3
 """Startup script for Hugging Face Spaces deployment."""
 
+import argparse
 import logging
 import os
 import subprocess
 import sys
 from pathlib import Path
 
+from boston311.config import config
+
 # Configure logging to show messages
 logging.basicConfig(
     level=logging.INFO,
@@ -39,7 +42,8 @@ def ensure_data_exists():
     con.load_extension("spatial")
 
     # Load all data without time filtering - using Path directly is safe here
-    sql = """
+    order_by = ", ".join(config.SORT_COLUMNS)
+    sql = f"""
         SELECT 
             * EXCLUDE geometry,
             CASE 
@@ -49,15 +53,88 @@ def ensure_data_exists():
             END as geometry
         FROM data
         WHERE geom_4326 IS NOT NULL 
+        ORDER BY {order_by}
     """
-    con.sql(f"COPY ({sql}) TO '{output_path}' (FORMAT 'parquet')")
+    con.sql(
+        f"COPY ({sql}) TO '{output_path}' "
+        f"(FORMAT 'parquet', ROW_GROUP_SIZE {config.ROW_GROUP_SIZE})"
+    )
     log.info(f"Saved to: {output_path}")
 
 
+def prepare_database():
+    """Build the requests database once, before any server worker starts.
+
+    Workers attach the file read-only instead of each building their own;
+    ``PREBUILT_ENV`` makes a worker fail rather than rebuild it.
+    """
+    from boston311.database import PREBUILT_ENV, ensure_database
+
+    ensure_database(config.DATA_PATH, config.DATABASE_PATH)
+    os.environ[PREBUILT_ENV] = "1"
+
+
+def share_resources(num_procs: int):
+    """Split the DuckDB threads and memory and the result cache between workers.
+
+    Every worker has its own DuckDB buffer pool and result cache, so without
+    this each would size them for the whole machine.
+    """
+    from boston311.database import MEMORY_LIMIT_ENV, THREADS_ENV
+    from boston311.result_cache import MAX_BYTES_ENV
+
+    threads = config.DUCKDB_THREADS or os.cpu_count() or 1
+    os.environ[THREADS_ENV] = str(max(1, threads // num_procs))
+    os.environ[MAX_BYTES_ENV] = str(config.RESULT_CACHE_MAX_BYTES // num_procs)
+
+    # DuckDB defaults to 80% of RAM per database, i.e. per worker
+    if config.DUCKDB_MEMORY_LIMIT is None and num_procs > 1:
+        memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+        os.environ[MEMORY_LIMIT_ENV] = f"{int(memory * 0.8 / num_procs) // 2**20}MiB"
+
+    memory_limit = os.environ.get(MEMORY_LIMIT_ENV) or config.DUCKDB_MEMORY_LIMIT
+    log.info(
+        f"Each worker gets {os.environ[THREADS_ENV]} DuckDB thread(s), "
+        f"a DuckDB memory limit of {memory_limit or 'the default'} "
+        f"and a {os.environ[MAX_BYTES_ENV]} byte result cache"
+    )
+
+
 def main():
     """Start the Panel application."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--num-procs",
+        type=int,
+        default=config.NUM_PROCS,
+        help="Number of server worker processes (0 uses one per core)",
+    )
+    parser.add_argument(
+        "--warmup",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Initialize the database and shared state in each worker before "
+        "it serves sessions (before the server starts with one process, on "
+        "each worker's event loop right after it started with several)",
+    )
+    parser.add_argument(
+        "--warmup-background",
+        action="store_true",
+        help="Warm the time periods in a background thread after startup "
+        "instead of before serving",
+    )
+    args = parser.parse_args()
+    if args.num_procs < 0:
+        parser.error("--num-procs must be 0 or more")
+
+    # Panel only defers --setup to each worker with more than one process; with
+    # 0 the warmup would run in the parent before Bokeh forks, so resolve it here
+    num_procs = args.num_procs or os.cpu_count() or 1
+
     # Ensure data exists before starting the app
     ensure_data_exists()
+    prepare_database()
+    share_resources(num_procs)
 
     # Set environment variables for Panel/Bokeh
     os.environ["PANEL_ALLOW_WEBSOCKET_ORIGIN"] = "*"
@@ -82,10 +159,27 @@ def main():
         port,
         "--allow-websocket-origin",
         "*",
+        "--num-procs",
+        str(num_procs),
         "--show",
     ]
 
-    log.info(f"Starting Panel app on port {port}...")
+    # Panel runs the setup script in every worker process before serving
+    if args.warmup:
+        cmd += ["--setup", str(Path("src/boston311/warmup.py"))]
+        if args.warmup_background:
+            from boston311.warmup import BACKGROUND_ENV
+
+            os.environ[BACKGROUND_ENV] = "1"
+
+    # Serve the offline tile pyramid next to the app, if it has been built
+    if config.TILE_PYRAMID_PATH.exists():
+        cmd += [
+            "--static-dirs",
+            f"{config.TILE_ROUTE}={config.TILE_PYRAMID_PATH}",
+        ]
+
+    log.info(f"Starting Panel app on port {port} with {num_procs} process(es)...")
     log.info(f"Command: {' '.join(cmd)}")
 
     subprocess.run(cmd)
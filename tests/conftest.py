@@ -0,0 +1,96 @@
+"""Shared fixtures: a small synthetic requests database."""
+
+from collections.abc import Iterator
+
+import duckdb
+import pytest
+
+from boston311.config import config
+from boston311.database import (
+    DATABASE_ALIAS,
+    get_connection,
+    get_data_version,
+    get_tile_pyramid,
+)
+from boston311.result_cache import result_cache
+from boston311.sql_utils import QueryBuilder
+
+NEIGHBORHOODS = ("Back Bay", "Dorchester", "Roxbury")
+SOURCES = ("Citizens Connect App", "Constituent Call")
+SUBJECTS = ("Public Works Department", "Transportation - Traffic Division")
+
+
+def _enum(values: tuple[str, ...]) -> str:
+    return "ENUM (" + ", ".join(f"'{value}'" for value in values) + ")"
+
+
+def create_database(rows: int = 300) -> duckdb.DuckDBPyConnection:
+    """Create an in-memory database shaped like the built one.
+
+    Rows are spread over the first hours of the current year, so they fall
+    into the default time period. ``geometry`` only holds a placeholder, as
+    the tests run without the spatial extension.
+    """
+    con = duckdb.connect()
+    con.sql(f"ATTACH ':memory:' AS {DATABASE_ALIAS}")
+    con.sql(f"USE {DATABASE_ALIAS}")
+    con.sql(f"CREATE TYPE neighborhood_enum AS {_enum(NEIGHBORHOODS)}")
+    con.sql(f"CREATE TYPE source_enum AS {_enum(SOURCES)}")
+    con.sql(f"CREATE TYPE subject_enum AS {_enum(SUBJECTS)}")
+    con.sql(f"""
+        CREATE TABLE requests AS
+        SELECT
+            i::BIGINT AS row_id,
+            date_trunc('year', current_date)::TIMESTAMP
+                + to_minutes(i::BIGINT) AS open_dt,
+            ['{"', '".join(SOURCES)}'][i % {len(SOURCES)} + 1]::source_enum
+                AS source,
+            ['{"', '".join(SUBJECTS)}'][i % {len(SUBJECTS)} + 1]::subject_enum
+                AS subject,
+            ['{"', '".join(NEIGHBORHOODS)}'][i % {len(NEIGHBORHOODS)} + 1]
+                ::neighborhood_enum AS neighborhood,
+            'POINT' AS geometry,
+            -71.1 + (i % 17) * 0.005 AS lon,
+            42.3 + (i % 13) * 0.005 AS lat
+        FROM range({rows}) t(i)
+    """)
+    con.sql("""
+        CREATE TABLE daily_counts AS
+        SELECT
+            open_dt::DATE AS day,
+            neighborhood,
+            source,
+            subject,
+            count(*) AS count,
+            NULL::BIGINT AS open_count,
+            NULL::BIGINT AS closed_count,
+            NULL::DOUBLE AS response_hours_sum
+        FROM requests
+        GROUP BY ALL
+    """)
+    con.sql("""
+        CREATE TABLE build_info AS
+        SELECT 0 AS schema_version, 'test' AS source_fingerprint
+    """)
+    return con
+
+
+@pytest.fixture
+def database(monkeypatch) -> Iterator[duckdb.DuckDBPyConnection]:
+    """Swap the synthetic database in as the shared connection.
+
+    Box queries filter on lon/lat, as there is no R-tree index to use.
+    """
+    monkeypatch.setattr(config, "SPATIAL_INDEX", False)
+    QueryBuilder._bbox_query.cache_clear()
+    con = create_database()
+    get_connection.set(con)
+    get_tile_pyramid.set(None)
+    get_data_version.reset()
+    result_cache.invalidate()
+    yield con
+    QueryBuilder._bbox_query.cache_clear()
+    get_connection.reset()
+    get_tile_pyramid.reset()
+    get_data_version.reset()
+    result_cache.invalidate()
@@ -0,0 +1,27 @@
+"""Tests for the dashboard state."""
+
+from boston311.dashboard import StateViewer
+
+from .conftest import NEIGHBORHOODS, SOURCES, SUBJECTS
+
+
+def test_new_session_loads_options_and_data(database):
+    viewer = StateViewer()
+
+    assert set(viewer.param.neighborhood.objects) == {*NEIGHBORHOODS, "All"}
+    assert set(viewer.param.source.objects) == {*SOURCES, "All"}
+    assert set(viewer.param.subject.objects) == {*SUBJECTS, "All"}
+    assert viewer.binned
+    assert viewer.data is not None and viewer.data.num_rows > 0
+
+
+def test_empty_selection_clears_the_layer(database):
+    viewer = StateViewer()
+    assert viewer.lb_map.layers
+
+    # Sources and subjects alternate together, so this pair never occurs
+    viewer.param.update(source=SOURCES[0], subject=SUBJECTS[1])
+
+    assert viewer.data.num_rows == 0
+    assert not viewer.lb_map.layers
+    assert viewer.color_legend == {}
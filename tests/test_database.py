@@ -0,0 +1,35 @@
+"""Tests for the database queries."""
+
+import pyarrow as pa
+
+import boston311.database as db
+from boston311.database import fetch_viewport_points, open_cursor
+from boston311.sql_utils import FilterState
+from boston311.tiles import Tile
+from boston311.time_periods import DEFAULT_TIME_PERIOD, current_time_periods
+
+# Tiles at zoom 10 covering the synthetic points, and one far away
+BOSTON = Tile(10, 309, 378)
+ELSEWHERE = Tile(10, 0, 0)
+
+
+def test_viewport_points_skip_empty_tiles(database, monkeypatch):
+    filters = FilterState.from_selection(current_time_periods()[DEFAULT_TIME_PERIOD])
+    fetch_tile_points = db.fetch_tile_points
+
+    def fetch_in_chunks(con, filters, tile, version=None):
+        # Prepend the zero-length chunk a filtered pyramid tile can carry
+        table = fetch_tile_points(con, filters, tile, version)
+        batches = table.to_batches()
+        return pa.Table.from_batches(
+            [batches[0].slice(0, 0), *batches] if batches else [], table.schema
+        )
+
+    monkeypatch.setattr(db, "fetch_tile_points", fetch_in_chunks)
+    with open_cursor(database) as cursor:
+        points = fetch_viewport_points(cursor, filters, (ELSEWHERE, BOSTON))
+        empty = fetch_viewport_points(cursor, filters, (ELSEWHERE,))
+
+    assert points.num_rows == 300
+    assert points.column("row_id").num_chunks == 1
+    assert empty.num_rows == 0
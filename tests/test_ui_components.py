@@ -0,0 +1,22 @@
+"""Tests for the dashboard UI components."""
+
+import panel as pn
+
+from boston311.database import fetch_dataframe, open_cursor
+from boston311.sql_utils import QueryBuilder
+from boston311.ui_components import create_table_view
+
+from .conftest import NEIGHBORHOODS
+
+
+def test_table_view_renders_enum_columns(database):
+    with open_cursor(database) as cursor:
+        selected = fetch_dataframe(cursor, *QueryBuilder.row_by_id(4))
+
+    view = create_table_view(selected, show_table=True)
+
+    table = view.objects[1]
+    assert isinstance(table, pn.pane.DataFrame)
+    assert table.object.loc[0, "neighborhood"] == NEIGHBORHOODS[4 % len(NEIGHBORHOODS)]
+    assert "geometry" not in table.object.columns
+    table.get_root()